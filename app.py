@@ -4,11 +4,13 @@ load_dotenv()  # must be first — loads .env before any other import reads os.e
 import os
 from nicegui import ui, app
 from core.db import get_db
+from core.http_client import close_clients
+from core.settings import SETTINGS
+from ui.layout import build_layout
 
 
 @ui.page('/')
 async def index():
-    from ui.layout import build_layout
     await build_layout()
 
 
@@ -24,8 +26,8 @@ def main():
         print(f"[ApiHive] MongoDB connection failed: {e}")
         raise SystemExit(1)
 
-    ssl_verify = os.getenv("SSL_VERIFY", "true").lower() != "false"
-    app.state.ssl_verify = ssl_verify
+    SETTINGS.ssl_verify = os.getenv("SSL_VERIFY", "true").lower() != "false"
+    app.on_shutdown(close_clients)
 
     ui.run(title='ApiHive', port=8080, reload=False, storage_secret='apihive-dev-secret')
 
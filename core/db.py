@@ -1,14 +1,22 @@
 import os
 import time
-from pymongo import MongoClient
+from pymongo import MongoClient, ReturnDocument
+from pymongo.cursor import Cursor
 from pymongo.database import Database
 from core.models import Collection, Item, Environment, Globals
 
 _client: MongoClient | None = None
+_indexes_ensured = False
+
+# Short-lived read caches for documents fetched on every request execution.
+# Entries are (fetched_at, doc); writes through this module invalidate them.
+_CACHE_TTL = 5.0
+_globals_cache: tuple[float, dict] | None = None
+_env_cache: dict[str, tuple[float, dict]] = {}
 
 
 def get_db() -> Database:
-    global _client
+    global _client, _indexes_ensured
     mongo_uri = os.getenv("MONGO_URI")
     if not mongo_uri:
         raise RuntimeError(
@@ -18,13 +26,31 @@ def get_db() -> Database:
     if _client is None:
         _client = MongoClient(mongo_uri)
     db_name = os.getenv("MONGO_DB", "apihive")
-    return _client[db_name]
+    db = _client[db_name]
+    if not _indexes_ensured:
+        _ensure_indexes(db)
+        _indexes_ensured = True
+    return db
+
+
+def _ensure_indexes(db: Database) -> None:
+    """Create indexes for the hot item queries (idempotent; runs once per process)."""
+    # delete_item / get_script_chain: $graphLookup over parent_id
+    db.items.create_index([("parent_id", 1)])
+    # list_children_sorted: equality on both ids, sort on order — no in-memory sort.
+    # Its collection_id prefix also serves _delete_items_by_collection.
+    db.items.create_index([("collection_id", 1), ("parent_id", 1), ("order", 1)])
 
 
 # ── Collections ───────────────────────────────────────────────────────────────
 
-def list_collections() -> list[dict]:
-    return list(get_db().collections.find({}, {"_id": 1, "name": 1, "pre_request_script": 1, "post_request_script": 1, "variables": 1, "auth": 1, "created_at": 1, "updated_at": 1}))
+def list_collections() -> Cursor:
+    # Sidebar only needs names; scripts/variables/auth are fetched via get_collection on demand
+    return get_db().collections.find({}, {"_id": 1, "name": 1}).batch_size(200)
+
+
+def get_collection(id: str) -> dict | None:
+    return get_db().collections.find_one({"_id": id})
 
 
 def create_collection(name: str) -> dict:
@@ -50,8 +76,15 @@ def _delete_items_by_collection(collection_id: str) -> None:
 
 # ── Items ─────────────────────────────────────────────────────────────────────
 
-def list_items(collection_id: str) -> list[dict]:
-    return list(get_db().items.find({"collection_id": collection_id}).sort("order", 1))
+# Tree fields only — use get_item for the full document when a request is opened
+_TREE_FIELDS = {"_id": 1, "name": 1, "type": 1, "method": 1, "collection_id": 1, "parent_id": 1, "order": 1}
+
+
+def list_children_sorted(collection_id: str, parent_id: str | None) -> Cursor:
+    """Direct children of *parent_id* (None = collection root), ordered by 'order'."""
+    return get_db().items.find(
+        {"collection_id": collection_id, "parent_id": parent_id}, _TREE_FIELDS
+    ).sort("order", 1).batch_size(1000)
 
 
 def create_item(data: dict) -> dict:
@@ -63,6 +96,31 @@ def create_item(data: dict) -> dict:
     return doc
 
 
+def _apply_defaults(doc: dict) -> dict:
+    """Fill the fields Item would default, without running Pydantic validation."""
+    doc.setdefault("parent_id", None)
+    doc.setdefault("order", 0)
+    doc.setdefault("pre_request_script", "")
+    doc.setdefault("post_request_script", "")
+    doc.setdefault("method", "GET")
+    doc.setdefault("url", "")
+    doc.setdefault("params", [])
+    doc.setdefault("headers", [])
+    doc.setdefault("body", {"mode": "none", "raw": "", "urlencoded": []})
+    doc.setdefault("auth", {"type": "none"})
+    return doc
+
+
+def create_items(docs: list[dict]) -> None:
+    """
+    Bulk insert for pre-built item docs (importer path) — one insert_many round trip.
+    Docs must already carry _id, collection_id, type and name; no model validation is done.
+    """
+    if not docs:
+        return
+    get_db().items.insert_many([_apply_defaults(d) for d in docs], ordered=False)
+
+
 def get_item(id: str) -> dict | None:
     return get_db().items.find_one({"_id": id})
 
@@ -72,17 +130,30 @@ def update_item(id: str, data: dict) -> None:
 
 
 def delete_item(id: str) -> None:
-    # recursively delete all children first
-    children = list(get_db().items.find({"parent_id": id}, {"_id": 1}))
-    for child in children:
-        delete_item(child["_id"])
-    get_db().items.delete_one({"_id": id})
+    # collect every descendant in one aggregation, then delete them all at once
+    db = get_db()
+    pipeline = [
+        {"$match": {"_id": id}},
+        {"$graphLookup": {
+            "from": "items",
+            "startWith": "$_id",
+            "connectFromField": "_id",
+            "connectToField": "parent_id",
+            "as": "descendants",
+        }},
+        {"$project": {"descendants._id": 1}},
+    ]
+    doc = next(db.items.aggregate(pipeline, batchSize=64), None)
+    if doc is None:
+        return
+    ids = [id] + [d["_id"] for d in doc["descendants"]]
+    db.items.delete_many({"_id": {"$in": ids}})
 
 
 # ── Environments ──────────────────────────────────────────────────────────────
 
-def list_environments() -> list[dict]:
-    return list(get_db().environments.find({}))
+def list_environments() -> Cursor:
+    return get_db().environments.find({}).batch_size(200)
 
 
 def create_environment(name: str) -> dict:
@@ -91,33 +162,88 @@ def create_environment(name: str) -> dict:
     return doc
 
 
+def invalidate_env_caches() -> None:
+    """Drop cached environment/globals docs so the next read goes to MongoDB."""
+    global _globals_cache
+    _globals_cache = None
+    _env_cache.clear()
+
+
+def _copy_doc(doc: dict) -> dict:
+    """Copy a cached env/globals doc deep enough that callers can mutate its values."""
+    values = {k: dict(v) if isinstance(v, dict) else v for k, v in doc.get("values", {}).items()}
+    return {**doc, "values": values}
+
+
 def get_environment(id: str) -> dict | None:
-    return get_db().environments.find_one({"_id": id})
+    cached = _env_cache.get(id)
+    if cached is not None and time.time() - cached[0] < _CACHE_TTL:
+        return _copy_doc(cached[1])
+    doc = get_db().environments.find_one({"_id": id})
+    if doc is None:
+        _env_cache.pop(id, None)
+        return None
+    _env_cache[id] = (time.time(), doc)
+    return _copy_doc(doc)
 
 
 def update_environment(id: str, values: dict) -> None:
+    _env_cache.pop(id, None)
     get_db().environments.update_one(
         {"_id": id},
         {"$set": {"values": values, "updated_at": time.time()}}
     )
 
 
+def set_environment_values(id: str, updates: dict) -> None:
+    """
+    Upsert individual variables {key: value} into an environment with a single $set,
+    without re-sending the whole values dict. Keys that can't be used in a dotted
+    path ('.' or leading '$') fall back to a read-modify-write of the values dict.
+    """
+    _env_cache.pop(id, None)
+    safe = {k: v for k, v in updates.items() if "." not in k and not k.startswith("$")}
+    fields = {f"values.{k}": {"value": str(v), "enabled": True} for k, v in safe.items()}
+    fields["updated_at"] = time.time()
+    get_db().environments.update_one({"_id": id}, {"$set": fields})
+
+    if len(safe) < len(updates):
+        env = get_environment(id)
+        if env:
+            values = env.get("values", {})
+            for k, v in updates.items():
+                if k not in safe:
+                    values[k] = {"value": str(v), "enabled": True}
+            update_environment(id, values)
+
+
 def delete_environment(id: str) -> None:
+    _env_cache.pop(id, None)
     get_db().environments.delete_one({"_id": id})
 
 
 # ── Globals ───────────────────────────────────────────────────────────────────
 
 def get_globals() -> dict:
-    db = get_db()
-    doc = db.globals.find_one({"_id": "global"})
-    if doc is None:
-        doc = Globals().model_dump(by_alias=True)
-        db.globals.insert_one(doc)
-    return doc
+    global _globals_cache
+    if _globals_cache is not None and time.time() - _globals_cache[0] < _CACHE_TTL:
+        return _copy_doc(_globals_cache[1])
+    # Single race-free round trip: creates the default doc on first use
+    defaults = Globals().model_dump(by_alias=True)
+    defaults.pop("_id")
+    doc = get_db().globals.find_one_and_update(
+        {"_id": "global"},
+        {"$setOnInsert": defaults},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    _globals_cache = (time.time(), doc)
+    return _copy_doc(doc)
 
 
 def update_globals(values: dict) -> None:
+    global _globals_cache
+    _globals_cache = None
     get_db().globals.update_one(
         {"_id": "global"},
         {"$set": {"values": values}},
@@ -129,7 +255,7 @@ def update_globals(values: dict) -> None:
 
 def get_script_chain(item_id: str) -> list[dict]:
     """
-    Walks the parent_id chain upward from item_id.
+    Walks the parent_id chain upward from item_id (single $graphLookup).
     Returns ordered list outermost → innermost:
     [
       {"pre": "...", "post": "...", "level": "collection"},
@@ -138,26 +264,36 @@ def get_script_chain(item_id: str) -> list[dict]:
     ]
     """
     db = get_db()
-    item = db.items.find_one({"_id": item_id})
+    # One aggregation collects the item and all its ancestor folders
+    pipeline = [
+        {"$match": {"_id": item_id}},
+        {"$graphLookup": {
+            "from": "items",
+            "startWith": "$parent_id",
+            "connectFromField": "parent_id",
+            "connectToField": "_id",
+            "as": "ancestors",
+            "depthField": "depth",
+        }},
+        {"$project": {
+            "pre_request_script": 1,
+            "post_request_script": 1,
+            "collection_id": 1,
+            "ancestors.pre_request_script": 1,
+            "ancestors.post_request_script": 1,
+            "ancestors.depth": 1,
+        }},
+    ]
+    item = next(db.items.aggregate(pipeline, batchSize=64), None)
     if not item:
         return []
 
     chain = []
-    # Walk up the parent chain collecting folders
-    current = item
-    while current.get("parent_id"):
-        parent = db.items.find_one({"_id": current["parent_id"]})
-        if not parent:
-            break
-        chain.append({
-            "pre": parent.get("pre_request_script", ""),
-            "post": parent.get("post_request_script", ""),
-            "level": "folder",
-        })
-        current = parent
-
     # Get collection-level scripts
-    collection = db.collections.find_one({"_id": item["collection_id"]})
+    collection = db.collections.find_one(
+        {"_id": item["collection_id"]},
+        {"pre_request_script": 1, "post_request_script": 1},
+    )
     if collection:
         chain.append({
             "pre": collection.get("pre_request_script", ""),
@@ -165,8 +301,13 @@ def get_script_chain(item_id: str) -> list[dict]:
             "level": "collection",
         })
 
-    # Reverse so order is outermost (collection) → innermost (request)
-    chain.reverse()
+    # Folders, outermost (greatest depth) → innermost
+    for parent in sorted(item["ancestors"], key=lambda a: a["depth"], reverse=True):
+        chain.append({
+            "pre": parent.get("pre_request_script", ""),
+            "post": parent.get("post_request_script", ""),
+            "level": "folder",
+        })
 
     # Append the request itself
     chain.append({
@@ -1,60 +1,108 @@
 """
 HTTP request executor — implements the 9-step flow from plan.md.
 """
+import asyncio
+import json
+from urllib.parse import urlencode
+
 import httpx
 from core import db, variables, script_runner
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# One pooled client per ssl_verify setting, reused across requests so keep-alive
+# connections and TLS sessions survive between Sends.
+_clients: dict[bool, httpx.AsyncClient] = {}
+
+_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=100, keepalive_expiry=30.0)
+# httpx timeouts are per phase (the old flat 30.0 applied to each of them); dead hosts
+# now fail faster on connect, and every phase stays bounded so nothing hangs forever.
+_TIMEOUT = httpx.Timeout(connect=10.0, read=30.0, write=30.0, pool=30.0)
+
+
+def _get_client(ssl_verify: bool) -> httpx.AsyncClient:
+    client = _clients.get(ssl_verify)
+    if client is None:
+        client = _clients[ssl_verify] = httpx.AsyncClient(
+            verify=ssl_verify,
+            limits=_LIMITS,
+            timeout=_TIMEOUT,
+        )
+    return client
+
+
+async def close_clients() -> None:
+    """Close all pooled HTTP clients (registered as an app shutdown hook)."""
+    while _clients:
+        _, client = _clients.popitem()
+        await client.aclose()
+
 
 def _flatten_env(local_env: dict, active_env_values: dict, global_values: dict) -> dict:
     """Build a flat {key: value_string} dict for the script runner (priority: local > active > global)."""
     result = {}
-    for k, v in global_values.items():
-        if isinstance(v, dict):
-            if v.get('enabled', True):
-                result[k] = str(v.get('value', ''))
-        else:
-            result[k] = str(v)
-    for k, v in active_env_values.items():
-        if isinstance(v, dict):
-            if v.get('enabled', True):
-                result[k] = str(v.get('value', ''))
-        else:
-            result[k] = str(v)
+    for source in (global_values, active_env_values):
+        for k, v in source.items():
+            if type(v) is dict:
+                if v.get('enabled', True):
+                    val = v.get('value', '')
+                    result[k] = val if type(val) is str else str(val)
+            else:
+                result[k] = v if type(v) is str else str(v)
     result.update(local_env)  # local always wins
     return result
 
 
-def _resolve_item_fields(item: dict, local_env: dict, active_env_values: dict, global_values: dict) -> dict:
-    """Resolve {{variables}} in url, headers, params, body of an item."""
+def _build_request(item: dict, local_env: dict, active_env_values: dict, global_values: dict) -> dict:
+    """
+    Resolve {{variables}} in an item and produce the final request arguments in one pass:
+    {"method": str, "url": str, "params": dict, "headers": httpx.Headers, "content": bytes | None}
+    """
     def res(text: str) -> str:
         return variables.resolve(text, local_env, active_env_values, global_values)
 
-    resolved = dict(item)
-    resolved['url'] = res(item.get('url', ''))
-
-    resolved['params'] = [
-        {**p, 'value': res(p.get('value', '')), 'key': res(p.get('key', ''))}
-        for p in item.get('params', [])
-        if p.get('enabled', True)
-    ]
-
-    resolved['headers'] = [
-        {**h, 'value': res(h.get('value', '')), 'key': res(h.get('key', ''))}
-        for h in item.get('headers', [])
-        if h.get('enabled', True)
-    ]
-
-    body = dict(item.get('body', {'mode': 'none', 'raw': '', 'urlencoded': []}))
-    if body.get('mode') == 'raw':
-        body['raw'] = res(body.get('raw', ''))
-    elif body.get('mode') == 'urlencoded':
-        body['urlencoded'] = [
-            {**u, 'key': res(u.get('key', '')), 'value': res(u.get('value', ''))}
+    params = {}
+    for p in item.get('params', []):
+        if p.get('enabled', True):
+            params[res(p.get('key', ''))] = res(p.get('value', ''))
+
+    # httpx.Headers is case-insensitive, so the Content-Type checks below are plain lookups
+    headers = httpx.Headers()
+    for h in item.get('headers', []):
+        if h.get('enabled', True):
+            headers[res(h.get('key', ''))] = res(h.get('value', ''))
+
+    content = None
+    body = item.get('body') or {}
+    body_mode = body.get('mode', 'none')
+    if body_mode == 'raw':
+        content = res(body.get('raw', '')).encode('utf-8')
+        if 'content-type' not in headers:
+            headers['Content-Type'] = 'application/json'
+    elif body_mode == 'urlencoded':
+        content = urlencode([
+            (res(u.get('key', '')), res(u.get('value', '')))
             for u in body.get('urlencoded', [])
             if u.get('enabled', True)
-        ]
-    resolved['body'] = body
-    return resolved
+        ]).encode('utf-8')
+        if 'content-type' not in headers:
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+
+    return {
+        'method': item.get('method', 'GET').upper(),
+        'url': res(item.get('url', '')),
+        'params': params,
+        'headers': headers,
+        'content': content,
+    }
+
+
+async def _no_env() -> None:
+    return None
 
 
 async def execute_request(item_id: str, active_env_id: str | None, ssl_verify: bool) -> dict:
@@ -71,13 +119,18 @@ async def execute_request(item_id: str, active_env_id: str | None, ssl_verify: b
     console_output: list[str] = []
     all_env_updates: dict = {}
 
-    # Step 1: get script chain (outermost → innermost)
-    chain = db.get_script_chain(item_id)
-
-    # Step 2: resolve env_vars
-    local_env = variables.load_local_env()
-    active_env_values = variables.get_active_env_values(active_env_id)
-    global_values = variables.get_global_values()
+    # Steps 1, 2 and the item read from step 4 are independent blocking reads —
+    # run them concurrently on worker threads so setup costs ~1 round trip, not 4.
+    chain, local_env, env, global_values, item = await asyncio.gather(
+        # Step 1: get script chain (outermost → innermost)
+        asyncio.to_thread(db.get_script_chain, item_id),
+        # Step 2: resolve env_vars (the active env is fetched once; step 8 only writes if it exists)
+        asyncio.to_thread(variables.load_local_env),
+        asyncio.to_thread(db.get_environment, active_env_id) if active_env_id else _no_env(),
+        asyncio.to_thread(variables.get_global_values),
+        asyncio.to_thread(db.get_item, item_id),
+    )
+    active_env_values = dict(env['values']) if env else {}
     current_env_vars = _flatten_env(local_env, active_env_values, global_values)
 
     # Step 3: run pre-request scripts
@@ -85,7 +138,7 @@ async def execute_request(item_id: str, active_env_id: str | None, ssl_verify: b
         script = entry.get('pre', '')
         level = entry.get('level', 'request')
         if script and script.strip():
-            result = script_runner.run_pre_request(script, current_env_vars)
+            result = await script_runner.run_pre_request_async(script, current_env_vars, ssl_verify)
             for line in result.get('console_output', []):
                 console_output.append(f'[{level}] {line}')
             if result.get('error'):
@@ -107,57 +160,37 @@ async def execute_request(item_id: str, active_env_id: str | None, ssl_verify: b
                 global_values[k] = {'value': v, 'enabled': True}
 
     # Step 4: resolve variables in item fields
-    item = db.get_item(item_id)
     if not item:
         return {
             'response_data': None,
             'console_output': console_output,
             'script_error': f'Item {item_id} not found',
         }
-    resolved = _resolve_item_fields(item, local_env, active_env_values, global_values)
+    request = _build_request(item, local_env, active_env_values, global_values)
 
     # Step 5: send HTTP request
-    method = resolved.get('method', 'GET').upper()
-    url = resolved.get('url', '')
-    params = {p['key']: p['value'] for p in resolved.get('params', [])}
-    headers = {h['key']: h['value'] for h in resolved.get('headers', [])}
-    body = resolved.get('body', {})
-    body_mode = body.get('mode', 'none')
-
-    content = None
-    if body_mode == 'raw':
-        raw_text = body.get('raw', '')
-        content = raw_text.encode('utf-8')
-        if 'content-type' not in {k.lower() for k in headers}:
-            headers['Content-Type'] = 'application/json'
-    elif body_mode == 'urlencoded':
-        pairs = body.get('urlencoded', [])
-        content = '&'.join(
-            f"{u['key']}={u['value']}" for u in pairs
-        ).encode('utf-8')
-        if 'content-type' not in {k.lower() for k in headers}:
-            headers['Content-Type'] = 'application/x-www-form-urlencoded'
-
     try:
-        async with httpx.AsyncClient(verify=ssl_verify) as client:
-            response = await client.request(
-                method, url,
-                params=params,
-                headers=headers,
-                content=content,
-                timeout=30.0,
-            )
+        client = _get_client(ssl_verify)
+        response = await client.request(
+            request['method'], request['url'],
+            params=request['params'],
+            headers=request['headers'],
+            content=request['content'],
+        )
         elapsed_ms = response.elapsed.total_seconds() * 1000
+        # Decode the body once: parse JSON straight from bytes, then build the text view
+        raw = response.content
         try:
-            body_json = response.json()
+            body_json = _json_loads(raw)
         except Exception:
             body_json = None
+        body_text = raw.decode(response.encoding or 'utf-8', errors='replace')
 
         # Step 6: build response_data
         response_data = {
             'status': response.status_code,
-            'headers': dict(response.headers),
-            'body_text': response.text,
+            'headers': dict(response.headers.items()),
+            'body_text': body_text,
             'body_json': body_json,
             'elapsed_ms': elapsed_ms,
         }
@@ -175,7 +208,7 @@ async def execute_request(item_id: str, active_env_id: str | None, ssl_verify: b
         script = entry.get('post', '')
         level = entry.get('level', 'request')
         if script and script.strip():
-            result = script_runner.run_post_request(script, current_env_vars, response_data)
+            result = await script_runner.run_post_request_async(script, current_env_vars, response_data, ssl_verify)
             for line in result.get('console_output', []):
                 console_output.append(f'[{level}] {line}')
             if result.get('error'):
@@ -184,13 +217,8 @@ async def execute_request(item_id: str, active_env_id: str | None, ssl_verify: b
             all_env_updates.update(result.get('env_updates', {}))
 
     # Step 8: persist env_updates to active environment
-    if all_env_updates and active_env_id:
-        env = db.get_environment(active_env_id)
-        if env:
-            values = env.get('values', {})
-            for k, v in all_env_updates.items():
-                values[k] = {'value': str(v), 'enabled': True}
-            db.update_environment(active_env_id, values)
+    if all_env_updates and env:
+        db.set_environment_values(active_env_id, all_env_updates)
 
     # Step 9: return
     return {
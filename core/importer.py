@@ -4,9 +4,24 @@ Converts a .postman_collection.json file into MongoDB documents (collections + i
 """
 import json
 import uuid
+from typing import BinaryIO
+
+from pymongo.errors import BulkWriteError
 
 from core import db
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+_BATCH_SIZE = 500
+
+# Canonical values shared by every item with no events / no body (never mutated).
+_EMPTY_EVENTS = {'pre_request_script': '', 'post_request_script': ''}
+_EMPTY_BODY = {'mode': 'none', 'raw': '', 'urlencoded': []}
+
 
 def _parse_events(events: list) -> dict:
     """
@@ -14,6 +29,8 @@ def _parse_events(events: list) -> dict:
     'prerequest' → pre_request_script
     'test'       → post_request_script
     """
+    if not events:
+        return _EMPTY_EVENTS
     pre_script = ''
     post_script = ''
     for event in events:
@@ -49,9 +66,11 @@ def _parse_url(url_obj) -> tuple[str, list]:
 
 def _parse_body(body_obj: dict) -> dict:
     if not body_obj:
-        return {'mode': 'none', 'raw': '', 'urlencoded': []}
+        return _EMPTY_BODY
 
     mode = body_obj.get('mode', 'none')
+    if mode == 'none':
+        return _EMPTY_BODY
     if mode == 'raw':
         return {'mode': 'raw', 'raw': body_obj.get('raw', ''), 'urlencoded': []}
     if mode == 'urlencoded':
@@ -65,7 +84,25 @@ def _parse_body(body_obj: dict) -> dict:
         ]
         return {'mode': 'urlencoded', 'raw': '', 'urlencoded': ue}
     # formdata and other modes → none for MVP
-    return {'mode': 'none', 'raw': '', 'urlencoded': []}
+    return _EMPTY_BODY
+
+
+def _flush_pending(pending: list, errors: list, counter: list):
+    """Insert buffered item docs in one batch and record per-doc failures."""
+    if not pending:
+        return
+    try:
+        db.create_items(pending)
+        counter[0] += len(pending)
+    except BulkWriteError as exc:
+        write_errors = exc.details.get('writeErrors', [])
+        counter[0] += len(pending) - len(write_errors)
+        for err in write_errors:
+            name = pending[err['index']].get('name', '?')
+            errors.append(f'Item "{name}": {err.get("errmsg", "write failed")}')
+    except Exception as exc:
+        errors.append(f'Batch of {len(pending)} items: {exc}')
+    pending.clear()
 
 
 def _import_items(
@@ -74,8 +111,9 @@ def _import_items(
     parent_id,
     errors: list,
     counter: list,
+    pending: list,
 ):
-    """Recursively import Postman items (folders and requests)."""
+    """Recursively build Postman items (folders and requests) into *pending* for batched insert."""
     for order_idx, pm_item in enumerate(postman_items):
         try:
             name = pm_item.get('name', 'Untitled')
@@ -83,7 +121,7 @@ def _import_items(
 
             if 'item' in pm_item:
                 # ── Folder ────────────────────────────────────────────────────
-                folder_id = str(uuid.uuid4())
+                folder_id = uuid.uuid4().hex
                 folder_doc = {
                     '_id': folder_id,
                     'collection_id': collection_id,
@@ -94,11 +132,10 @@ def _import_items(
                     'pre_request_script': events['pre_request_script'],
                     'post_request_script': events['post_request_script'],
                 }
-                db.create_item(folder_doc)
-                counter[0] += 1
+                pending.append(folder_doc)
                 # Recurse into children
                 _import_items(
-                    pm_item['item'], collection_id, folder_id, errors, counter
+                    pm_item['item'], collection_id, folder_id, errors, counter, pending
                 )
 
             elif 'request' in pm_item:
@@ -120,7 +157,7 @@ def _import_items(
                 auth = req.get('auth', {'type': 'none'})
 
                 req_doc = {
-                    '_id': str(uuid.uuid4()),
+                    '_id': uuid.uuid4().hex,
                     'collection_id': collection_id,
                     'parent_id': parent_id,
                     'type': 'request',
@@ -135,12 +172,14 @@ def _import_items(
                     'body': body,
                     'auth': auth,
                 }
-                db.create_item(req_doc)
-                counter[0] += 1
+                pending.append(req_doc)
 
         except Exception as exc:
             errors.append(f'Item "{pm_item.get("name", "?")}": {exc}')
 
+        if len(pending) >= _BATCH_SIZE:
+            _flush_pending(pending, errors, counter)
+
 
 def import_postman_v21(filepath: str) -> dict:
     """
@@ -159,12 +198,16 @@ def import_postman_v21(filepath: str) -> dict:
     return _import_data(data)
 
 
-def import_from_content(content: bytes) -> dict:
+def import_from_content(content: bytes | BinaryIO) -> dict:
     """
-    Same as import_postman_v21 but accepts raw file bytes instead of a path.
+    Same as import_postman_v21 but accepts raw file bytes, or a binary file-like
+    object (e.g. the upload's spooled file), instead of a path.
     Used by the browser file-picker upload flow.
+    JSON is parsed straight from bytes — no intermediate decoded str copy.
     """
-    data = json.loads(content.decode('utf-8'))
+    if hasattr(content, 'read'):
+        content = content.read()
+    data = _json_loads(content)
     return _import_data(data)
 
 
@@ -197,7 +240,9 @@ def _import_data(data: dict) -> dict:
     })
 
     counter = [0]
-    _import_items(data.get('item', []), collection_id, None, errors, counter)
+    pending: list[dict] = []
+    _import_items(data.get('item', []), collection_id, None, errors, counter, pending)
+    _flush_pending(pending, errors, counter)
 
     return {
         'collection_id': collection_id,
@@ -7,7 +7,7 @@ from pydantic import BaseModel, Field, ConfigDict
 class Collection(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
 
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()), alias="_id")
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex, alias="_id")
     name: str
     auth: dict = Field(default_factory=lambda: {"type": "none"})
     variables: dict = Field(default_factory=dict)
@@ -20,7 +20,7 @@ class Collection(BaseModel):
 class Item(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
 
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()), alias="_id")
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex, alias="_id")
     collection_id: str
     parent_id: str | None = None
     type: Literal["folder", "request"]
@@ -41,7 +41,7 @@ class Item(BaseModel):
 class Environment(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
 
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()), alias="_id")
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex, alias="_id")
     name: str
     values: dict[str, dict] = Field(default_factory=dict)
     updated_at: float = Field(default_factory=time.time)
@@ -2,136 +2,287 @@
 JS script runner using PyMiniRacer (V8 embedded).
 Implements the two-phase pm.sendRequest model from plan.md.
 """
+import asyncio
+import atexit
+import hashlib
 import json
 import re
+import threading
+from urllib.parse import urlencode
+
 import httpx
 
+# py_mini_racer is imported on first use (see _get_racer) so importing this module
+# doesn't load V8 at app startup.
+
 try:
-    from py_mini_racer import MiniRacer
-    _RACER_AVAILABLE = True
+    import orjson
+
+    def _json_dumps(obj) -> str:
+        try:
+            return orjson.dumps(obj).decode()
+        except TypeError:  # e.g. ints beyond 64 bits — stdlib handles those
+            return json.dumps(obj)
+
+    _json_loads = orjson.loads
 except ImportError:
-    _RACER_AVAILABLE = False
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
+_AWAIT_RE = re.compile(r'\bawait\s+')
+
+# Static pm/console skeleton, evaluated once into the shared isolate. Per-run state
+# (env vars, response, sendRequest behaviour) is passed in by the small dynamic
+# preamble from _make_preamble, so the bulk of the JS is parsed only once.
+_STATIC_PREAMBLE_JS = """
+var __apihive = {
+  MAX_LOG_LINES: 500,
+  MAX_LOG_ARG: 4096,
+  makeConsole: function(logs) {
+    return {
+      log: function() {
+        if (logs.length >= __apihive.MAX_LOG_LINES) return;
+        var parts = [];
+        for (var i = 0; i < arguments.length; i++) {
+          var a = arguments[i];
+          var s = (a !== null && typeof a === 'object') ? JSON.stringify(a) : String(a);
+          if (s.length > __apihive.MAX_LOG_ARG) s = s.slice(0, __apihive.MAX_LOG_ARG) + '…';
+          parts.push(s);
+        }
+        logs.push(parts.join(' '));
+      }
+    };
+  },
+  makePm: function(envVars, resp, sendRequest, logs, envUpdates) {
+    return {
+      environment: {
+        _vars: envVars,
+        get: function(key) { return this._vars[key] !== undefined ? this._vars[key] : null; },
+        set: function(key, value) {
+          this._vars[key] = String(value);
+          envUpdates[key] = String(value);
+        }
+      },
+      response: (function() {
+        if (!resp) return undefined;
+        return {
+          status: resp.status,
+          statusCode: resp.status,
+          headers: resp.headers,
+          text: function() { return resp.body_text || ''; },
+          json: function() { return resp.body_json !== undefined ? resp.body_json : null; }
+        };
+      })(),
+      sendRequest: sendRequest,
+      require: function(pkg) {
+        logs.push('[warn] pm.require("' + pkg + '") is not supported in ApiHive');
+        return {};
+      },
+      execution: {
+        runRequest: function(id) {
+          logs.push('[warn] pm.execution.runRequest is not supported in ApiHive');
+          return { body: {} };
+        }
+      }
+    };
+  },
+  mockSendRequest: function() {
+    var captured = null;
+    var fn = function(opts) {
+      captured = opts;
+      return {
+        status: 0, statusCode: 0,
+        headers: {},
+        text: function() { return ''; },
+        json: function() { return null; }
+      };
+    };
+    fn.__captured = function() { return captured; };
+    return fn;
+  },
+  realSendRequest: function(resp) {
+    return function(opts) {
+      return {
+        status: resp.status,
+        statusCode: resp.status,
+        headers: resp.headers,
+        text: function() { return resp.body_text || ''; },
+        json: function() { return resp.body_json !== undefined ? resp.body_json : null; }
+      };
+    };
+  }
+};
+"""
+
+# Fingerprint of the static preamble, stored in the isolate as __apihive.ready. It lets
+# _eval detect an isolate that lacks the current skeleton (fresh, or clobbered by a
+# user script assigning to the global) and re-inject it only then.
+_STATIC_PREAMBLE_HASH = hashlib.blake2b(_STATIC_PREAMBLE_JS.encode(), digest_size=8).hexdigest()
+_READY_CHECK_JS = "(typeof __apihive === 'object' && __apihive !== null) ? __apihive.ready : ''"
+
+# A single V8 isolate reused for every script run. Each run is wrapped in an IIFE
+# (see _wrap) so its `var`s stay local; the lock serialises access because an
+# isolate is single-threaded.
+# Scripts stay in sloppy mode, as in Postman's sandbox, so an undeclared assignment
+# (`x = 5`) still creates a global. _eval deletes every global the run added before
+# releasing the isolate, so no script sees another's leftovers. Changes made to
+# existing builtins (e.g. `JSON.foo = 1`) are not undone.
+_CTX = None
+_CTX_LOCK = threading.Lock()
+_racer_loaded = False
+
+_GLOBAL_NAMES_JS = "JSON.stringify(Object.getOwnPropertyNames(globalThis))"
+_cleanup_js = ""   # built from the isolate's global names once the skeleton is injected
+
+
+def _get_racer():
+    """Return the shared MiniRacer context, creating it on first use; None if py-mini-racer is missing."""
+    global _CTX, _racer_loaded
+    if not _racer_loaded:
+        with _CTX_LOCK:
+            if not _racer_loaded:
+                try:
+                    from py_mini_racer import MiniRacer
+                except ImportError:
+                    MiniRacer = None
+                if MiniRacer is not None:
+                    _CTX = MiniRacer()
+                _racer_loaded = True
+    return _CTX
+
+
+# Bridge responses larger than this are truncated (text) and never JSON-parsed.
+_BRIDGE_BODY_LIMIT = 1024 * 1024
+
+# Pooled sync clients for pm.sendRequest, one per ssl_verify setting (mirrors http_client).
+_bridge_clients: dict[bool, httpx.Client] = {}
+
+
+def _get_bridge_client(ssl_verify: bool) -> httpx.Client:
+    client = _bridge_clients.get(ssl_verify)
+    if client is None:
+        client = _bridge_clients[ssl_verify] = httpx.Client(
+            verify=ssl_verify,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=30,
+        )
+    return client
+
+
+@atexit.register
+def _close_bridge_clients() -> None:
+    while _bridge_clients:
+        _, client = _bridge_clients.popitem()
+        client.close()
+
 
+def _wrap(body: str) -> str:
+    """Wrap preamble + script in a function scope; *body* must end with a return statement."""
+    return "(function() {\n" + body + "\n})()"
 
-def _make_preamble(env_vars: dict, response_obj: dict | None, send_request_js: str) -> str:
-    """Build the JS preamble injected before user scripts."""
-    env_json = json.dumps(env_vars)
-    response_js = json.dumps(response_obj) if response_obj is not None else "undefined"
 
+def _user_block(script: str) -> str:
+    """The user script as its own nested call, so a top-level `return` (allowed by Postman)
+    ends only the script and the result suffix after it still runs."""
+    return "(function() {\n" + script + "\n})();"
+
+
+def _make_cleanup_js(keep_names: list[str]) -> str:
+    """JS that deletes every own property of globalThis not in *keep_names*."""
+    keep = _json_dumps(dict.fromkeys(keep_names, 1))
+    return (
+        "(function(keep) {\n"
+        "  var names = Object.getOwnPropertyNames(globalThis);\n"
+        "  for (var i = 0; i < names.length; i++) {\n"
+        "    if (!Object.prototype.hasOwnProperty.call(keep, names[i])) delete globalThis[names[i]];\n"
+        "  }\n"
+        f"}})({keep});"
+    )
+
+
+def _eval(js: str):
+    global _cleanup_js
+    ctx = _get_racer()
+    with _CTX_LOCK:
+        if ctx.eval(_READY_CHECK_JS) != _STATIC_PREAMBLE_HASH:
+            ctx.eval(_STATIC_PREAMBLE_JS + f"\n__apihive.ready = '{_STATIC_PREAMBLE_HASH}';")
+            _cleanup_js = _make_cleanup_js(_json_loads(ctx.eval(_GLOBAL_NAMES_JS)))
+        try:
+            return ctx.eval(js)
+        finally:
+            ctx.eval(_cleanup_js)
+
+
+def _make_preamble(env_json: str, response_js: str, send_request_js: str) -> str:
+    """Build the per-run JS preamble injected before user scripts (JSON args pre-serialised)."""
     return f"""
 var __logs = [];
 var __env_updates = {{}};
-var console = {{
-  log: function() {{
-    __logs.push(Array.prototype.slice.call(arguments)
-      .map(function(a) {{ return typeof a === 'object' ? JSON.stringify(a) : String(a); }})
-      .join(' '));
-  }}
-}};
-var pm = {{
-  environment: {{
-    _vars: {env_json},
-    get: function(key) {{ return this._vars[key] !== undefined ? this._vars[key] : null; }},
-    set: function(key, value) {{
-      this._vars[key] = String(value);
-      __env_updates[key] = String(value);
-    }}
-  }},
-  response: (function() {{
-    var _r = {response_js};
-    if (!_r) return undefined;
-    return {{
-      status: _r.status,
-      statusCode: _r.status,
-      headers: _r.headers,
-      text: function() {{ return _r.body_text || ''; }},
-      json: function() {{ return _r.body_json !== undefined ? _r.body_json : null; }}
-    }};
-  }})(),
-  sendRequest: {send_request_js},
-  require: function(pkg) {{
-    __logs.push('[warn] pm.require("' + pkg + '") is not supported in ApiHive');
-    return {{}};
-  }},
-  execution: {{
-    runRequest: function(id) {{
-      __logs.push('[warn] pm.execution.runRequest is not supported in ApiHive');
-      return {{ body: {{}} }};
-    }}
-  }}
-}};
+var console = __apihive.makeConsole(__logs);
+var pm = __apihive.makePm({env_json}, {response_js}, {send_request_js}, __logs, __env_updates);
 """
 
 
-_MOCK_SEND_REQUEST_JS = """
-(function() {
-  var __captured = null;
-  var fn = function(opts) {
-    __captured = opts;
-    return {
-      status: 0, statusCode: 0,
-      headers: {},
-      text: function() { return ''; },
-      json: function() { return null; }
-    };
-  };
-  fn.__captured = function() { return __captured; };
-  return fn;
-})()
-"""
+_MOCK_SEND_REQUEST_JS = "__apihive.mockSendRequest()"
 
 
 def _make_real_send_request_js(response: dict) -> str:
     """Return JS for pm.sendRequest that always returns the given real response."""
-    resp_json = json.dumps(response)
-    return f"""
-(function() {{
-  var _resp = {resp_json};
-  return function(opts) {{
-    return {{
-      status: _resp.status,
-      statusCode: _resp.status,
-      headers: _resp.headers,
-      text: function() {{ return _resp.body_text || ''; }},
-      json: function() {{ return _resp.body_json !== undefined ? _resp.body_json : null; }}
-    }};
-  }};
-}})()
-"""
+    return f"__apihive.realSendRequest({_json_dumps(response)})"
 
 
 _RETURN_SUFFIX = """
-JSON.stringify({ env_updates: __env_updates, console_output: __logs });
+return JSON.stringify({ env_updates: __env_updates, console_output: __logs });
 """
 
 
-def _execute_script(script: str, env_vars: dict, response_obj: dict | None) -> dict:
+def _execute_script(script: str, env_vars: dict, response_obj: dict | None, ssl_verify: bool = True) -> dict:
     """
     Run a single-phase execution.
     Returns {"env_updates": {}, "console_output": [], "error": None | str, "_captured_request": None}
     """
-    if not _RACER_AVAILABLE:
-        return {"env_updates": {}, "console_output": [], "error": "py-mini-racer is not installed", "_captured_request": None}
-
     if not script or not script.strip():
         return {"env_updates": {}, "console_output": [], "error": None, "_captured_request": None}
 
+    if _get_racer() is None:
+        return {"env_updates": {}, "console_output": [], "error": "py-mini-racer is not installed", "_captured_request": None}
+
     # V8 eval mode doesn't support top-level `await` — strip it as a compatibility shim
     # for Postman collections that use async APIs we don't support anyway.
-    script = re.sub(r'\bawait\s+', '', script)
+    script = _user_block(_AWAIT_RE.sub('', script))
+
+    # Serialise once; both phases inject the same env and response
+    env_json = _json_dumps(env_vars)
+    response_js = _json_dumps(response_obj) if response_obj is not None else "undefined"
+
+    # Fast path: a script that never mentions sendRequest can't trigger phase 2,
+    # so skip the capture bookkeeping and return the result directly.
+    if 'sendRequest' not in script:
+        preamble = _make_preamble(env_json, response_js, _MOCK_SEND_REQUEST_JS)
+        try:
+            r = _json_loads(_eval(_wrap(preamble + "\n" + script + "\n" + _RETURN_SUFFIX)))
+        except Exception as e:
+            return {"env_updates": {}, "console_output": [], "error": str(e), "_captured_request": None}
+        return {
+            "env_updates": r.get("env_updates", {}),
+            "console_output": r.get("console_output", []),
+            "error": None,
+            "_captured_request": None,
+        }
 
     # Phase 1: use mock sendRequest to detect if pm.sendRequest is called
-    phase1_preamble = _make_preamble(env_vars, response_obj, _MOCK_SEND_REQUEST_JS)
+    phase1_preamble = _make_preamble(env_json, response_js, _MOCK_SEND_REQUEST_JS)
     # We need to extract __captured after the script runs
     phase1_full = phase1_preamble + "\n" + script + "\n" + """
-var __result = JSON.stringify({ env_updates: __env_updates, console_output: __logs });
 var __captured_req = pm.sendRequest.__captured ? pm.sendRequest.__captured() : null;
-JSON.stringify({ result: JSON.parse(__result), captured: __captured_req });
+return JSON.stringify({
+  result: { env_updates: __env_updates, console_output: __logs },
+  captured: __captured_req
+});
 """
     try:
-        ctx = MiniRacer()
-        raw = ctx.eval(phase1_full)
-        phase1_data = json.loads(raw)
+        raw = _eval(_wrap(phase1_full))
+        phase1_data = _json_loads(raw)
         captured_request = phase1_data.get("captured")
     except Exception as e:
         return {"env_updates": {}, "console_output": [], "error": str(e), "_captured_request": None}
@@ -147,17 +298,16 @@ JSON.stringify({ result: JSON.parse(__result), captured: __captured_req });
         }
 
     # Python bridge: execute the captured HTTP request
-    bridge_response = _execute_bridge_request(captured_request)
+    bridge_response = _execute_bridge_request(captured_request, ssl_verify)
 
     # Phase 2: re-run with real response injected into pm.sendRequest
     real_sr_js = _make_real_send_request_js(bridge_response)
-    phase2_preamble = _make_preamble(env_vars, response_obj, real_sr_js)
+    phase2_preamble = _make_preamble(env_json, response_js, real_sr_js)
     phase2_full = phase2_preamble + "\n" + script + "\n" + _RETURN_SUFFIX
 
     try:
-        ctx2 = MiniRacer()
-        raw2 = ctx2.eval(phase2_full)
-        r2 = json.loads(raw2)
+        raw2 = _eval(_wrap(phase2_full))
+        r2 = _json_loads(raw2)
         return {
             "env_updates": r2.get("env_updates", {}),
             "console_output": r2.get("console_output", []),
@@ -168,8 +318,8 @@ JSON.stringify({ result: JSON.parse(__result), captured: __captured_req });
         return {"env_updates": {}, "console_output": [], "error": str(e), "_captured_request": captured_request}
 
 
-def _execute_bridge_request(opts: dict) -> dict:
-    """Execute a pm.sendRequest options dict via httpx (synchronous)."""
+def _execute_bridge_request(opts: dict, ssl_verify: bool = True) -> dict:
+    """Execute a pm.sendRequest options dict via a pooled httpx client (synchronous)."""
     url = opts.get("url", "")
     method = opts.get("method", "GET").upper()
 
@@ -188,21 +338,29 @@ def _execute_bridge_request(opts: dict) -> dict:
             content = body_obj.get("raw", "").encode()
         elif mode == "urlencoded":
             pairs = body_obj.get("urlencoded", [])
-            content = "&".join(
-                f"{p.get('key', '')}={p.get('value', '')}"
+            content = urlencode([
+                (p.get("key", ""), p.get("value", ""))
                 for p in pairs if not p.get("disabled", False)
-            ).encode()
+            ]).encode()
 
     try:
-        resp = httpx.request(method, url, headers=headers, content=content, timeout=30)
-        try:
-            body_json = resp.json()
-        except Exception:
-            body_json = None
+        resp = _get_bridge_client(ssl_verify).request(method, url, headers=headers, content=content)
+        # Only JSON responses are parsed, and only from the already-decoded text;
+        # everything is capped so huge or binary bodies aren't fed back into V8.
+        raw = resp.content
+        body_json = None
+        if "json" in resp.headers.get("content-type", "") and len(raw) <= _BRIDGE_BODY_LIMIT:
+            body_text = resp.text
+            try:
+                body_json = _json_loads(body_text)
+            except Exception:
+                pass
+        else:
+            body_text = raw[:_BRIDGE_BODY_LIMIT].decode(resp.encoding or "utf-8", errors="replace")
         return {
             "status": resp.status_code,
-            "headers": dict(resp.headers),
-            "body_text": resp.text,
+            "headers": dict(resp.headers.items()),
+            "body_text": body_text,
             "body_json": body_json,
         }
     except Exception as e:
@@ -214,12 +372,12 @@ def _execute_bridge_request(opts: dict) -> dict:
         }
 
 
-def run_pre_request(script: str, env_vars: dict) -> dict:
+def run_pre_request(script: str, env_vars: dict, ssl_verify: bool = True) -> dict:
     """
     Run a pre-request script.
     Returns: {"env_updates": {}, "console_output": [], "error": None | str}
     """
-    result = _execute_script(script, env_vars, response_obj=None)
+    result = _execute_script(script, env_vars, response_obj=None, ssl_verify=ssl_verify)
     return {
         "env_updates": result["env_updates"],
         "console_output": result["console_output"],
@@ -227,15 +385,25 @@ def run_pre_request(script: str, env_vars: dict) -> dict:
     }
 
 
-def run_post_request(script: str, env_vars: dict, response_data: dict) -> dict:
+def run_post_request(script: str, env_vars: dict, response_data: dict, ssl_verify: bool = True) -> dict:
     """
     Run a post-request script.
     response_data = {status, headers, body_text, body_json}
     Returns: {"env_updates": {}, "console_output": [], "error": None | str}
     """
-    result = _execute_script(script, env_vars, response_obj=response_data)
+    result = _execute_script(script, env_vars, response_obj=response_data, ssl_verify=ssl_verify)
     return {
         "env_updates": result["env_updates"],
         "console_output": result["console_output"],
         "error": result["error"],
     }
+
+
+async def run_pre_request_async(script: str, env_vars: dict, ssl_verify: bool = True) -> dict:
+    """run_pre_request on a worker thread, so V8 and pm.sendRequest don't block the event loop."""
+    return await asyncio.to_thread(run_pre_request, script, env_vars, ssl_verify)
+
+
+async def run_post_request_async(script: str, env_vars: dict, response_data: dict, ssl_verify: bool = True) -> dict:
+    """run_post_request on a worker thread, so V8 and pm.sendRequest don't block the event loop."""
+    return await asyncio.to_thread(run_post_request, script, env_vars, response_data, ssl_verify)
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class Settings:
+    """Process-wide runtime settings: seeded from .env in app.main(), toggled from the UI."""
+    ssl_verify: bool = True
+    # Sidebar: show a folder whose only child is a folder as one "a/b" row
+    flatten_folder_chains: bool = False
+
+
+SETTINGS = Settings()
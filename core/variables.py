@@ -1,13 +1,49 @@
-from dotenv import dotenv_values
+import functools
+import os
+
+_MISSING = object()
+_ENV_FILE = ".env"
+_ENV_CACHE: dict = {"mtime": None, "data": {}}
 
 
 def load_local_env() -> dict:
-    """Load variables from .env file (not os.environ). Excludes system keys."""
-    return {
-        k: v
-        for k, v in dotenv_values(".env").items()
-        if k not in ("MONGO_URI", "MONGO_DB", "SSL_VERIFY")
-    }
+    """Load variables from .env file (not os.environ). Excludes system keys.
+    The parsed file is cached and only re-read when its mtime changes."""
+    try:
+        mtime = os.stat(_ENV_FILE).st_mtime
+    except OSError:
+        return {}
+    if mtime != _ENV_CACHE["mtime"]:
+        from dotenv import dotenv_values
+        _ENV_CACHE["data"] = {
+            k: v
+            for k, v in dotenv_values(_ENV_FILE).items()
+            if k not in ("MONGO_URI", "MONGO_DB", "SSL_VERIFY")
+        }
+        _ENV_CACHE["mtime"] = mtime
+    return dict(_ENV_CACHE["data"])
+
+
+@functools.lru_cache(maxsize=4096)
+def _compile_template(text: str) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """Split text into (literals, keys); len(literals) == len(keys) + 1."""
+    literals: list[str] = []
+    keys: list[str] = []
+    i = 0
+    while True:
+        j = text.find("{{", i)
+        if j < 0:
+            break
+        k = text.find("}}", j + 2)
+        if k < 0:
+            break
+        # innermost opener before the closer, so "{{a{{b}}" yields key "b"
+        j = text.rfind("{{", j, k)
+        literals.append(text[i:j])
+        keys.append(text[j + 2:k])
+        i = k + 2
+    literals.append(text[i:])
+    return tuple(literals), tuple(keys)
 
 
 def resolve(text: str, local_env: dict, active_env_values: dict, global_values: dict) -> str:
@@ -17,16 +53,28 @@ def resolve(text: str, local_env: dict, active_env_values: dict, global_values:
     val_obj may be a dict {"value": ..., "enabled": true} or a plain string.
     One pass only — nested {{vars}} in values are NOT recursively resolved.
     """
-    merged = {**global_values, **active_env_values, **local_env}
-    for key, val_obj in merged.items():
-        if isinstance(val_obj, dict):
-            if not val_obj.get("enabled", True):
-                continue
-            val = str(val_obj.get("value", ""))
+    if "{{" not in text:
+        return text
+    literals, keys = _compile_template(text)
+    if not keys:
+        return text
+    # Look each placeholder up by priority instead of merging every variable per call
+    sources = (local_env, active_env_values, global_values)
+    out = [literals[0]]
+    for key, literal in zip(keys, literals[1:]):
+        val_obj = _MISSING
+        for source in sources:
+            if key in source:
+                val_obj = source[key]
+                break
+        if val_obj is _MISSING or (isinstance(val_obj, dict) and not val_obj.get("enabled", True)):
+            out.append(f"{{{{{key}}}}}")
+        elif isinstance(val_obj, dict):
+            out.append(str(val_obj.get("value", "")))
         else:
-            val = str(val_obj)
-        text = text.replace(f"{{{{{key}}}}}", val)
-    return text
+            out.append(str(val_obj))
+        out.append(literal)
+    return "".join(out)
 
 
 def get_active_env_values(active_env_id: str | None) -> dict:
@@ -43,3 +91,9 @@ def get_global_values() -> dict:
     from core import db
     g = db.get_globals()
     return g.get("values", {})
+
+
+def invalidate_env_cache() -> None:
+    """Force the next env/globals lookup to re-read MongoDB (e.g. after switching environments)."""
+    from core import db
+    db.invalidate_env_caches()
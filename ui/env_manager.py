@@ -3,77 +3,78 @@ Environment manager dialog — CRUD for environments and global variables.
 open_env_manager() is called from the Settings button in layout.py.
 """
 from nicegui import ui, app as nicegui_app
-from core import db
+from core import db, variables
+from ui.layout import invalidate_environments_cache
 
 
 # ── helpers ────────────────────────────────────────────────────────────────────
 
-def _build_kv_editor(container: ui.element, values: dict, on_change):
+def _build_kv_editor(container: ui.element, values: dict):
     """
     Render editable rows for an environment's values dict:
     { key: {"value": str, "enabled": bool} }
-    Mutates *values* in place.
+    Field edits aren't tracked per keystroke/blur; instead the returned read() callable
+    bulk-reads every row's inputs at save time and rewrites *values* in place.
+    read() returns None (after a notice, leaving *values* untouched) if two rows share a key.
     """
+    rows: list[dict] = []
+
+    def read() -> dict | None:
+        new_values = {}
+        for r in rows:
+            key = (r['key'].value or '').strip()
+            if not key:
+                continue
+            if key in new_values:
+                ui.notify(f'Variable "{key}" already exists', color='warning')
+                return None
+            new_values[key] = {'value': r['value'].value or '', 'enabled': bool(r['enabled'].value)}
+        values.clear()
+        values.update(new_values)
+        return values
+
     container.clear()
     with container:
-        for key in list(values.keys()):
-            _render_kv_row(container, values, key, on_change)
+        rows_column = ui.column().classes('w-full gap-1')
+        with rows_column:
+            for key, entry in values.items():
+                rows.append(_render_kv_row(rows, key, entry))
         ui.button('+ Add variable', icon='add',
-                  on_click=lambda _: _add_variable(container, values, on_change)).props('flat size=sm')
+                  on_click=lambda _: _add_variable(rows_column, rows)).props('flat size=sm')
+    return read
 
 
-def _render_kv_row(container, values, key, on_change):
-    """Render a single key-value row (not adding to container — called inside _build_kv_editor)."""
-    entry = values[key]
-    with ui.row().classes('w-full items-center gap-1 no-wrap'):
+def _render_kv_row(rows, key, entry) -> dict:
+    """Render a single key-value row in the current context; returns its element handles."""
+    with ui.row().classes('w-full items-center gap-1 no-wrap') as row:
         cb = ui.checkbox(value=entry.get('enabled', True))
-        cb.on('update:model-value',
-              lambda e, k=key: (_entry_set(values, k, 'enabled', bool(e.args)), on_change()))
-
         key_inp = ui.input(value=key, placeholder='Key').classes('flex-grow font-mono text-sm')
-        key_inp.on('change', lambda e, k=key: _rename_key(container, values, k, e.value, on_change))
-
         val_inp = ui.input(value=entry.get('value', ''), placeholder='Value').classes(
             'flex-grow font-mono text-sm'
         )
-        val_inp.on('change', lambda e, k=key: (_entry_set(values, k, 'value', e.value), on_change()))
-
+        handles = {'row': row, 'enabled': cb, 'key': key_inp, 'value': val_inp}
         ui.button(icon='delete',
-                  on_click=lambda _, k=key: _delete_key(container, values, k, on_change)).props(
+                  on_click=lambda _: _delete_row(rows, handles)).props(
             'flat round dense size=xs color=red-4'
         )
+    return handles
 
 
-def _entry_set(values, key, field, val):
-    if key in values:
-        values[key][field] = val
-
-
-def _rename_key(container, values, old_key, new_key, on_change):
-    if not new_key or new_key == old_key:
-        return
-    entry = values.pop(old_key, {'value': '', 'enabled': True})
-    values[new_key] = entry
-    _build_kv_editor(container, values, on_change)
-    on_change()
-
-
-def _add_variable(container, values, on_change):
+def _add_variable(rows_column, rows):
+    taken = {r['key'].value for r in rows}
     base = 'new_var'
     name = base
     idx = 1
-    while name in values:
+    while name in taken:
         name = f'{base}_{idx}'
         idx += 1
-    values[name] = {'value': '', 'enabled': True}
-    _build_kv_editor(container, values, on_change)
-    on_change()
+    with rows_column:
+        rows.append(_render_kv_row(rows, name, {'value': '', 'enabled': True}))
 
 
-def _delete_key(container, values, key, on_change):
-    values.pop(key, None)
-    _build_kv_editor(container, values, on_change)
-    on_change()
+def _delete_row(rows, handles):
+    rows.remove(handles)
+    handles['row'].delete()
 
 
 # ── main dialog ────────────────────────────────────────────────────────────────
@@ -86,8 +87,6 @@ def open_env_manager():
         'selected_env_id': None,
         'env_values': {},       # working copy of selected env's values dict
         'global_values': {},    # working copy of globals values dict
-        'dirty_env': False,
-        'dirty_globals': False,
     }
 
     with ui.dialog().classes('w-full') as dialog, ui.card().classes('w-full max-w-4xl'):
@@ -122,6 +121,7 @@ def open_env_manager():
                                         ui.notify('Name cannot be empty', color='negative')
                                         return
                                     db.create_environment(name)
+                                    invalidate_environments_cache()
                                     nd.close()
                                     _refresh_env_list()
 
@@ -142,6 +142,7 @@ def open_env_manager():
 
                                 def do_delete():
                                     db.delete_environment(eid)
+                                    invalidate_environments_cache()
                                     if nicegui_app.storage.user.get('active_env_id') == eid:
                                         nicegui_app.storage.user['active_env_id'] = ''
                                     state['selected_env_id'] = None
@@ -188,7 +189,6 @@ def open_env_manager():
                         k: dict(v) if isinstance(v, dict) else {'value': str(v), 'enabled': True}
                         for k, v in env.get('values', {}).items()
                     }
-                    state['dirty_env'] = False
                     _render_env_editor(env)
 
                 def _render_env_editor(env: dict):
@@ -196,17 +196,20 @@ def open_env_manager():
                     with right_container:
                         ui.label(f'Edit: {env["name"]}').classes('text-sm font-semibold text-gray-700')
                         kv_container = ui.column().classes('w-full gap-1')
-                        _build_kv_editor(kv_container, state['env_values'],
-                                         lambda: state.update({'dirty_env': True}))
+                        read_env = _build_kv_editor(kv_container, state['env_values'])
 
                         def activate():
                             nicegui_app.storage.user['active_env_id'] = env['_id']
+                            # pick up teammates' edits instead of a cached copy
+                            variables.invalidate_env_cache()
                             ui.notify(f'Active environment: {env["name"]}', color='positive')
                             _refresh_env_list()
 
                         def save_env():
-                            db.update_environment(env['_id'], state['env_values'])
-                            state['dirty_env'] = False
+                            values = read_env()
+                            if values is None:
+                                return
+                            db.update_environment(env['_id'], values)
                             ui.notify('Environment saved', color='positive')
 
                         with ui.row().classes('mt-2 gap-2'):
@@ -229,12 +232,13 @@ def open_env_manager():
                 }
 
                 globals_kv_container = ui.column().classes('w-full gap-1')
-                _build_kv_editor(globals_kv_container, state['global_values'],
-                                 lambda: state.update({'dirty_globals': True}))
+                read_globals = _build_kv_editor(globals_kv_container, state['global_values'])
 
                 def save_globals():
-                    db.update_globals(state['global_values'])
-                    state['dirty_globals'] = False
+                    values = read_globals()
+                    if values is None:
+                        return
+                    db.update_globals(values)
                     ui.notify('Global variables saved', color='positive')
 
                 ui.button('Save Globals', on_click=save_globals).props('color=positive size=sm').classes('mt-2')
@@ -2,10 +2,12 @@
 Import dialog — uses browser-native file picker (ui.upload) to select a
 .postman_collection.json file and import it into MongoDB.
 """
+import asyncio
+
 from nicegui import ui
 
 from core.importer import import_from_content
-from ui.sidebar import refresh_tree
+from ui.sidebar import invalidate_tree_cache, refresh_tree
 
 
 def open_import_dialog():
@@ -18,30 +20,31 @@ def open_import_dialog():
 
         status_label = ui.label('').classes('text-sm min-h-5')
 
-        upload = ui.upload(
-            label='Choose file',
-            auto_upload=True,
-            max_files=1,
-        ).props('accept=".json" flat bordered').classes('w-full')
-
         async def on_upload(e):
             status_label.set_text('Importing…')
             try:
-                result = import_from_content(e.content.read())
+                content = await e.file.read()
+                # Parsing and the batched inserts are blocking pymongo work: keep them off the loop
+                result = await asyncio.to_thread(import_from_content, content)
                 msg = f"Imported {result['imported_count']} items."
                 if result['errors']:
                     msg += f" ({len(result['errors'])} error(s): {result['errors'][0]})"
                 status_label.set_text(msg)
+                invalidate_tree_cache()
                 refresh_tree()
                 upload.reset()
                 # Close after a short delay so the user can read the result
-                import asyncio
                 await asyncio.sleep(1.5)
                 dialog.close()
             except Exception as exc:
                 status_label.set_text(f'Error: {exc}')
 
-        upload.on('upload', on_upload)
+        upload = ui.upload(
+            label='Choose file',
+            auto_upload=True,
+            max_files=1,
+            on_upload=on_upload,
+        ).props('accept=".json" flat bordered').classes('w-full')
 
         with ui.row().classes('mt-2'):
             ui.button('Cancel', on_click=dialog.close).props('flat')
@@ -1,5 +1,32 @@
+import asyncio
+import time
+
 from nicegui import ui, app as nicegui_app
-from core import db
+from core import db, variables
+from core.settings import SETTINGS
+from ui.importer_dialog import open_import_dialog
+from ui.request_tabs import build_request_tabs
+from ui.settings import open_settings_dialog
+from ui.sidebar import build_sidebar
+
+# (fetched_at, [{_id, name}, ...]) for the header's environment dropdown
+_ENVS_CACHE_TTL = 30.0
+_envs_cache: tuple[float, list[dict]] | None = None
+
+
+def invalidate_environments_cache():
+    """Drop the cached environment list (call after creating/deleting an environment)."""
+    global _envs_cache
+    _envs_cache = None
+
+
+async def _list_environments() -> list[dict]:
+    global _envs_cache
+    if _envs_cache is not None and time.time() - _envs_cache[0] < _ENVS_CACHE_TTL:
+        return _envs_cache[1]
+    envs = await asyncio.to_thread(lambda: [{'_id': e['_id'], 'name': e['name']} for e in db.list_environments()])
+    _envs_cache = (time.time(), envs)
+    return envs
 
 
 async def build_layout():
@@ -8,50 +35,43 @@ async def build_layout():
         with ui.row().classes('items-center gap-4'):
 
             # ── Live environment dropdown ────────────────────────────────────
-            envs = db.list_environments()
+            envs = await _list_environments()
             env_options = {'': 'No Environment'} | {e['_id']: e['name'] for e in envs}
             active_id = nicegui_app.storage.user.get('active_env_id', '')
 
+            def on_env_change(e):
+                nicegui_app.storage.user['active_env_id'] = e.value
+                # pick up teammates' edits instead of a cached copy
+                variables.invalidate_env_cache()
+
             env_select = ui.select(
                 options=env_options,
                 value=active_id if active_id in env_options else '',
                 label='Environment',
-                on_change=lambda e: nicegui_app.storage.user.update({'active_env_id': e.value}),
+                on_change=on_env_change,
             ).classes('w-48').props('dark filled dense')
 
             # ── SSL toggle ───────────────────────────────────────────────────
-            ssl_on = getattr(nicegui_app.state, 'ssl_verify', True)
             ssl_btn = ui.button(
-                f'SSL: {"ON" if ssl_on else "OFF"}',
+                f'SSL: {"ON" if SETTINGS.ssl_verify else "OFF"}',
             ).props('flat color=white size=sm')
 
             def toggle_ssl():
-                current = getattr(nicegui_app.state, 'ssl_verify', True)
-                nicegui_app.state.ssl_verify = not current
-                ssl_btn.set_text(f'SSL: {"ON" if nicegui_app.state.ssl_verify else "OFF"}')
+                SETTINGS.ssl_verify = not SETTINGS.ssl_verify
+                ssl_btn.set_text(f'SSL: {"ON" if SETTINGS.ssl_verify else "OFF"}')
 
             ssl_btn.on('click', toggle_ssl)
 
             # ── Import ───────────────────────────────────────────────────────
-            def open_import():
-                from ui.importer_dialog import open_import_dialog
-                open_import_dialog()
-
-            ui.button('Import', icon='upload_file', on_click=open_import).props('flat color=white')
+            ui.button('Import', icon='upload_file', on_click=open_import_dialog).props('flat color=white')
 
             # ── Settings ─────────────────────────────────────────────────────
-            def open_settings():
-                from ui.settings import open_settings_dialog
-                open_settings_dialog()
-
-            ui.button('Settings', icon='settings', on_click=open_settings).props('flat color=white')
+            ui.button('Settings', icon='settings', on_click=open_settings_dialog).props('flat color=white')
 
     with ui.row().classes('w-full flex-grow overflow-hidden').style('height: calc(100vh - 56px)'):
         # sidebar
         with ui.column().classes('border-r border-gray-200 h-full overflow-y-auto p-2').style('width: 280px; min-width: 280px'):
-            from ui.sidebar import build_sidebar
             await build_sidebar()
         # main area
         with ui.column().classes('flex-grow h-full overflow-hidden p-2'):
-            from ui.request_tabs import build_request_tabs
             await build_request_tabs()
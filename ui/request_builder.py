@@ -3,61 +3,79 @@ Request builder panel — method, URL, params, headers, body, pre/post-request s
 Auto-saves to MongoDB on changes (500 ms debounce). Wires Send button to http_client.
 """
 import asyncio
+import hashlib
+import json
+import time
 
-from nicegui import ui, app as nicegui_app
+from nicegui import background_tasks, ui, app as nicegui_app
 
 from core import db, http_client
+from core.settings import SETTINGS
+from core.variables import resolve, load_local_env, get_active_env_values, get_global_values
+from ui import request_tabs   # module import: request_tabs imports this module too
+
+_ENV_SNAPSHOT_TTL = 0.5   # seconds the URL preview reuses its variable lookups
 
 
 # ── Key-value table helper ─────────────────────────────────────────────────────
 
 def _build_kv_table(container: ui.element, pairs: list[dict], on_change):
-    """Render editable key-value rows into *container*. Mutates *pairs* in place."""
+    """Render editable key-value rows into *container*. Mutates *pairs* in place.
+    Rows are rendered once; add/delete then touch only the affected row."""
     container.clear()
     with container:
-        for i, pair in enumerate(pairs):
-            with ui.row().classes('w-full items-center gap-1 no-wrap'):
-                cb = ui.checkbox(value=pair.get('enabled', True))
-                cb.on('update:model-value',
-                      lambda e, _i=i: (_kv_set(pairs, _i, 'enabled', bool(e.args)), on_change()))
-
-                k_inp = ui.input(value=pair.get('key', ''), placeholder='Key').classes(
-                    'flex-grow font-mono text-sm'
-                )
-                k_inp.on('change',
-                         lambda e, _i=i: (_kv_set(pairs, _i, 'key', e.value), on_change()))
-
-                v_inp = ui.input(value=pair.get('value', ''), placeholder='Value').classes(
-                    'flex-grow font-mono text-sm'
-                )
-                v_inp.on('change',
-                         lambda e, _i=i: (_kv_set(pairs, _i, 'value', e.value), on_change()))
-
-                ui.button(
-                    icon='delete',
-                    on_click=lambda _, _i=i: _kv_delete(container, pairs, _i, on_change)
-                ).props('flat round dense size=xs color=red-4')
-
-        ui.button('Add row', icon='add', on_click=lambda _: _kv_add(container, pairs, on_change)).props(
+        rows = ui.column().classes('w-full gap-1')
+        with rows:
+            for pair in pairs:
+                _render_kv_row(pairs, pair, on_change)
+        ui.button('Add row', icon='add', on_click=lambda _: _kv_add(rows, pairs, on_change)).props(
             'flat size=sm'
         )
 
 
-def _kv_set(pairs, i, key, val):
-    if 0 <= i < len(pairs):
-        pairs[i][key] = val
+def _render_kv_row(pairs: list[dict], pair: dict, on_change):
+    """Render one row bound to *pair* itself (not its index), so deletes don't shift other rows."""
+    with ui.row().classes('w-full items-center gap-1 no-wrap') as row:
+        cb = ui.checkbox(value=pair.get('enabled', True))
+        cb.on('update:model-value',
+              lambda e: (_kv_set(pair, 'enabled', bool(e.args)), on_change()))
+
+        k_inp = ui.input(value=pair.get('key', ''), placeholder='Key').classes(
+            'flex-grow font-mono text-sm'
+        )
+        k_inp.on('change',
+                 lambda e: (_kv_set(pair, 'key', e.value), on_change()))
+
+        v_inp = ui.input(value=pair.get('value', ''), placeholder='Value').classes(
+            'flex-grow font-mono text-sm'
+        )
+        v_inp.on('change',
+                 lambda e: (_kv_set(pair, 'value', e.value), on_change()))
 
+        ui.button(
+            icon='delete',
+            on_click=lambda _: _kv_delete(row, pairs, pair, on_change)
+        ).props('flat round dense size=xs color=red-4')
 
-def _kv_add(container, pairs, on_change):
-    pairs.append({'key': '', 'value': '', 'enabled': True})
-    _build_kv_table(container, pairs, on_change)
+
+def _kv_set(pair, key, val):
+    pair[key] = val
+
+
+def _kv_add(rows, pairs, on_change):
+    pair = {'key': '', 'value': '', 'enabled': True}
+    pairs.append(pair)
+    with rows:
+        _render_kv_row(pairs, pair, on_change)
     on_change()
 
 
-def _kv_delete(container, pairs, i, on_change):
-    if 0 <= i < len(pairs):
-        pairs.pop(i)
-    _build_kv_table(container, pairs, on_change)
+def _kv_delete(row, pairs, pair, on_change):
+    for i, p in enumerate(pairs):
+        if p is pair:
+            pairs.pop(i)
+            break
+    row.delete()
     on_change()
 
 
@@ -69,6 +87,7 @@ def build_request_builder(item: dict, response_viewer=None):
     *response_viewer* is a ResponseViewer instance whose update_response() is called on Send.
     """
     item_id = item['_id']
+    client = ui.context.client   # the autosave timer fires outside any UI context
 
     # Working copies of mutable list/dict fields
     params: list[dict] = [dict(p) for p in item.get('params', [])]
@@ -92,7 +111,8 @@ def build_request_builder(item: dict, response_viewer=None):
     _send_btn_el: list = [None]
     _ue_container_el: list = [None]
 
-    _pending_task: list = [None]
+    _pending_task: list = [None]   # asyncio.TimerHandle of the pending debounced save
+    _last_saved_hash: list = [None]  # digest of the last data written to Mongo
 
     # ── data collection ────────────────────────────────────────────────────────
 
@@ -104,33 +124,49 @@ def build_request_builder(item: dict, response_viewer=None):
             'headers': req_headers,
             'body': {
                 'mode': _body_mode_el[0].value if _body_mode_el[0] else 'none',
-                'raw': _raw_editor_el[0].value if _raw_editor_el[0] else '',
+                'raw': _raw_editor_el[0].value if _raw_editor_el[0] else body_src.get('raw', ''),
                 'urlencoded': ue_pairs,
             },
-            'pre_request_script': _pre_editor_el[0].value if _pre_editor_el[0] else '',
-            'post_request_script': _post_editor_el[0].value if _post_editor_el[0] else '',
+            # Editors are created on first visit to their tab; until then the stored text stands
+            'pre_request_script': _pre_editor_el[0].value if _pre_editor_el[0] else item.get('pre_request_script', ''),
+            'post_request_script': _post_editor_el[0].value if _post_editor_el[0] else item.get('post_request_script', ''),
         }
 
+    def _data_hash(data: dict) -> bytes:
+        return hashlib.blake2b(
+            json.dumps(data, sort_keys=True, default=str).encode(), digest_size=16
+        ).digest()
+
+    async def _save_if_changed(data: dict) -> bool:
+        """Write *data* unless it is identical to the last write. Returns True if written."""
+        digest = _data_hash(data)
+        if digest == _last_saved_hash[0]:
+            return False
+        await asyncio.to_thread(db.update_item, item_id, data)
+        _last_saved_hash[0] = digest   # only once written: a failed write must be retried
+        return True
+
     # ── debounced save ─────────────────────────────────────────────────────────
 
     def schedule_save():
-        from ui.request_tabs import set_tab_dirty
-        set_tab_dirty(item_id, True)
-        task = _pending_task[0]
-        if task is not None and not task.done():
-            task.cancel()
+        request_tabs.set_tab_dirty(item_id, True)
+        # Debounce with a single timer handle: cancelling/re-arming it is cheap and
+        # allocates no Task or coroutine per keystroke. Only the final fire saves.
+        handle = _pending_task[0]
+        if handle is not None:
+            handle.cancel()
         try:
             loop = asyncio.get_event_loop()
-            _pending_task[0] = loop.create_task(_do_save())
+            # background_tasks holds a reference, so the save can't be collected mid-write
+            _pending_task[0] = loop.call_later(0.5, lambda: background_tasks.create(_do_save(), name='autosave'))
         except RuntimeError:
             pass
 
     async def _do_save():
-        await asyncio.sleep(0.5)
-        data = collect_data()
-        db.update_item(item_id, data)
-        from ui.request_tabs import set_tab_dirty
-        set_tab_dirty(item_id, False)
+        _pending_task[0] = None
+        await _save_if_changed(collect_data())
+        with client:   # tab state is per client
+            request_tabs.set_tab_dirty(item_id, False)
         if _saved_label_el[0]:
             _saved_label_el[0].set_visibility(True)
             await asyncio.sleep(1.5)
@@ -148,16 +184,31 @@ def build_request_builder(item: dict, response_viewer=None):
         if not url.startswith(('http://', 'https://')):
             ui.notify('URL must start with http:// or https://', color='warning')
             return
-        db.update_item(item_id, data)
+
+        # A new valid Send (or closing the tab) cancels the previous in-flight one
+        task = asyncio.current_task()
+        if task is not None:
+            request_tabs.register_send_task(item_id, task)
+
+        # Flush any pending debounced save into this one write instead of racing it
+        handle = _pending_task[0]
+        if handle is not None:
+            handle.cancel()
+            _pending_task[0] = None
+        await _save_if_changed(data)
+        request_tabs.set_tab_dirty(item_id, False)
 
         # 2. Execute request
         active_env_id = nicegui_app.storage.user.get('active_env_id')
-        ssl_verify = getattr(nicegui_app.state, 'ssl_verify', True)
+        ssl_verify = SETTINGS.ssl_verify
 
         if _send_btn_el[0]:
             _send_btn_el[0].props(add='loading')
         try:
             result = await http_client.execute_request(item_id, active_env_id, ssl_verify)
+        except asyncio.CancelledError:
+            # Superseded or tab closed — the viewer may already be detached
+            return
         except Exception as exc:
             result = {
                 'response_data': None,
@@ -165,7 +216,8 @@ def build_request_builder(item: dict, response_viewer=None):
                 'script_error': str(exc),
             }
         finally:
-            if _send_btn_el[0]:
+            # A superseded send leaves the spinner to the send that replaced it
+            if _send_btn_el[0] and request_tabs.is_current_send_task(item_id, task):
                 _send_btn_el[0].props(remove='loading')
 
         # 3. Pass to response viewer
@@ -206,16 +258,25 @@ def build_request_builder(item: dict, response_viewer=None):
         # Variable preview: resolved URL shown below the URL input when {{vars}} are present
         resolved_label = ui.label('').classes('text-xs text-gray-400 font-mono -mt-1')
 
+        _env_snapshot: list = [None]   # (active_env_id, timestamp, (local, active, global))
+
+        def _preview_env(active_env_id) -> tuple:
+            snap = _env_snapshot[0]
+            now = time.monotonic()
+            if snap is None or snap[0] != active_env_id or now - snap[1] > _ENV_SNAPSHOT_TTL:
+                snap = _env_snapshot[0] = (active_env_id, now, (
+                    load_local_env(),
+                    get_active_env_values(active_env_id),
+                    get_global_values(),
+                ))
+            return snap[2]
+
         def update_resolved(url: str):
-            from core.variables import resolve, load_local_env, get_active_env_values, get_global_values
+            if '{{' not in url:
+                resolved_label.set_text('')
+                return
             active_env_id = nicegui_app.storage.user.get('active_env_id')
-            resolved = resolve(
-                url,
-                load_local_env(),
-                get_active_env_values(active_env_id),
-                get_global_values(),
-            )
-            resolved_label.set_text(resolved if '{{' in url else '')
+            resolved_label.set_text(resolve(url, *_preview_env(active_env_id)))
 
         # Update resolved preview on every keystroke (piggybacks on _current_url already updated above)
         _url_el[0].on('input', lambda e: update_resolved(_current_url[0]))
@@ -249,23 +310,19 @@ def build_request_builder(item: dict, response_viewer=None):
                     value=body_src.get('mode', 'none'),
                 ).props('inline')
 
-                _raw_editor_el[0] = ui.codemirror(
-                    value=body_src.get('raw', ''),
-                    language='json',
-                    on_change=lambda _: schedule_save(),
-                ).classes('w-full mt-1').style('height: 200px')
+                raw_slot = ui.column().classes('w-full mt-1')
 
                 _ue_container_el[0] = ui.column().classes('w-full mt-1 gap-1')
                 _build_kv_table(_ue_container_el[0], ue_pairs, schedule_save)
 
                 # Set initial visibility
                 initial_mode = body_src.get('mode', 'none')
-                _raw_editor_el[0].set_visibility(initial_mode == 'raw')
                 _ue_container_el[0].set_visibility(initial_mode == 'urlencoded')
 
                 def on_body_mode_change(e):
                     mode = e.value
-                    _raw_editor_el[0].set_visibility(mode == 'raw')
+                    if _raw_editor_el[0]:
+                        _raw_editor_el[0].set_visibility(mode == 'raw')
                     _ue_container_el[0].set_visibility(mode == 'urlencoded')
                     schedule_save()
 
@@ -273,16 +330,43 @@ def build_request_builder(item: dict, response_viewer=None):
 
             # Pre-request Script
             with ui.tab_panel(pre_tab).classes('p-0 pt-1'):
-                _pre_editor_el[0] = ui.codemirror(
-                    value=item.get('pre_request_script', ''),
-                    language='javascript',
-                    on_change=lambda _: schedule_save(),
-                ).classes('w-full').style('height: 300px')
+                pre_slot = ui.column().classes('w-full')
 
             # Post-request Script
             with ui.tab_panel(post_tab).classes('p-0 pt-1'):
-                _post_editor_el[0] = ui.codemirror(
-                    value=item.get('post_request_script', ''),
+                post_slot = ui.column().classes('w-full')
+
+        # ── Lazy CodeMirror editors ────────────────────────────────────────────
+        # Each editor is built the first time its tab is shown, so opening a request
+        # costs no CodeMirror instances until the user actually looks at one.
+
+        def _make_raw():
+            with raw_slot:
+                _raw_editor_el[0] = ui.codemirror(
+                    value=body_src.get('raw', ''),
+                    language='json',
+                    on_change=lambda _: schedule_save(),
+                ).classes('w-full').style('height: 200px')
+            _raw_editor_el[0].set_visibility(_body_mode_el[0].value == 'raw')
+
+        def _make_script(slot, el_ref, field):
+            with slot:
+                el_ref[0] = ui.codemirror(
+                    value=item.get(field, ''),
                     language='javascript',
                     on_change=lambda _: schedule_save(),
                 ).classes('w-full').style('height: 300px')
+
+        _editor_factories = {
+            'Body': _make_raw,
+            'Pre-request': lambda: _make_script(pre_slot, _pre_editor_el, 'pre_request_script'),
+            'Post-request': lambda: _make_script(post_slot, _post_editor_el, 'post_request_script'),
+        }
+
+        def _ensure_editor(tab):
+            tab_name = tab if isinstance(tab, str) else tab.props.get('name')
+            factory = _editor_factories.pop(tab_name, None)
+            if factory is not None:
+                factory()
+
+        req_tabs.on_value_change(lambda e: _ensure_editor(e.value))
@@ -1,72 +1,138 @@
+import asyncio
+import weakref
+from collections import deque
+from dataclasses import dataclass, field
+
 from nicegui import ui, app as nicegui_app
 from core import db
+from ui import request_builder   # module import: request_builder imports this module too
+from ui.response_viewer import ResponseViewer
+
+_MAX_TABS = 10
+
+
+@dataclass(slots=True)
+class _TabsView:
+    """One client's tab strip and panels. The strip is a refreshable of labels only;
+    panels are added/removed individually so a dirty flag or a tab switch never
+    rebuilds the request builders and editors."""
+    bar_refresh: object = None
+    panels_el: ui.tab_panels | None = None
+    empty_el: ui.element | None = None
+    panel_els: dict[str, ui.tab_panel] = field(default_factory=dict)
+    # item_id -> in-flight Send task; entries drop out once the task is garbage-collected
+    send_tasks: 'weakref.WeakValueDictionary[str, asyncio.Task]' = field(
+        default_factory=weakref.WeakValueDictionary
+    )
+
+
+# client id -> that browser tab's view; each connection builds (and drops) its own
+_views: dict[str, _TabsView] = {}
+
 
-_tabs_refresh = None
+def _view() -> _TabsView:
+    """The calling client's view (an unattached placeholder if it has none yet)."""
+    return _views.get(ui.context.client.id) or _TabsView()
 
 
 async def build_request_tabs():
-    global _tabs_refresh
+    client = ui.context.client
+    view = _views[client.id] = _TabsView()
+    client.on_delete(lambda: _views.pop(client.id, None))
+
+    tabs_data: list[dict] = nicegui_app.storage.user.get('open_tabs', [])
+    active_tab = nicegui_app.storage.user.get('active_tab')
+    ids = [t['item_id'] for t in tabs_data]
+    if ids and (not active_tab or active_tab not in ids):
+        active_tab = ids[0]
+        nicegui_app.storage.user['active_tab'] = active_tab
+
+    # Fetch every open tab's item concurrently, off the event loop
+    items = await asyncio.gather(*(asyncio.to_thread(db.get_item, tid) for tid in ids))
+
+    def on_tab_change(e):
+        _select(view, e.value)
 
     @ui.refreshable
-    def tabs_ui():
+    def tabs_bar():
         tabs_data: list[dict] = nicegui_app.storage.user.get('open_tabs', [])
-
         if not tabs_data:
-            with ui.column().classes('w-full h-full items-center justify-center gap-3'):
-                ui.icon('open_in_browser').classes('text-6xl text-gray-300')
-                ui.label('Double-click a request to open it').classes('text-gray-400 text-lg')
             return
+        active = nicegui_app.storage.user.get('active_tab')
+        with ui.tabs(value=active, on_change=on_tab_change).classes('w-full shrink-0'):
+            for tab in tabs_data:
+                dirty = tab.get('dirty', False)
+                with ui.tab(name=tab['item_id'], label=''):
+                    with ui.row().classes('items-center gap-1 no-wrap'):
+                        ui.label(tab['label'] + (' ●' if dirty else '')).classes('text-sm')
+                        ui.button(
+                            icon='close',
+                            on_click=lambda _e, tid=tab['item_id']: _close_tab(tid)
+                        ).props('flat round dense size=xs').classes('text-gray-400 hover:text-red-500')
+
+    with ui.column().classes('w-full h-full overflow-hidden'):
+        with ui.column().classes('w-full h-full items-center justify-center gap-3') as view.empty_el:
+            ui.icon('open_in_browser').classes('text-6xl text-gray-300')
+            ui.label('Double-click a request to open it').classes('text-gray-400 text-lg')
+
+        tabs_bar()
+        view.panels_el = ui.tab_panels(value=active_tab).classes('w-full flex-grow overflow-auto')
+        for tid, item in zip(ids, items):
+            _add_panel(view, tid, item)
+
+    view.bar_refresh = tabs_bar.refresh
+    _update_empty(view)
+
+
+def _add_panel(view: _TabsView, item_id: str, item: dict | None):
+    with view.panels_el:
+        with ui.tab_panel(item_id) as panel:
+            if item:
+                # Create viewer object first (no DOM yet) so builder can reference it
+                viewer = ResponseViewer()
+                # Render request builder at top (references viewer for Send wiring)
+                request_builder.build_request_builder(item, viewer)
+                # Render response viewer DOM below the builder
+                viewer.build()
+            else:
+                ui.label('Request not found.').classes('text-gray-400')
+    view.panel_els[item_id] = panel
+
+
+def _remove_panel(view: _TabsView, item_id: str):
+    task = view.send_tasks.pop(item_id, None)
+    if task is not None and not task.done():
+        task.cancel()
+    panel = view.panel_els.pop(item_id, None)
+    if panel is not None:
+        panel.delete()
+
+
+def _select(view: _TabsView, item_id: str | None):
+    nicegui_app.storage.user['active_tab'] = item_id
+    if view.panels_el is not None:
+        view.panels_el.set_value(item_id)
 
-        active_tab = nicegui_app.storage.user.get('active_tab')
-        ids = [t['item_id'] for t in tabs_data]
-        if not active_tab or active_tab not in ids:
-            active_tab = ids[0]
-            nicegui_app.storage.user['active_tab'] = active_tab
-
-        def on_tab_change(e):
-            nicegui_app.storage.user['active_tab'] = e.value
-
-        with ui.column().classes('w-full h-full overflow-hidden'):
-            with ui.tabs(value=active_tab, on_change=on_tab_change).classes('w-full shrink-0') as qtabs:
-                for tab in tabs_data:
-                    dirty = tab.get('dirty', False)
-                    with ui.tab(name=tab['item_id'], label=''):
-                        with ui.row().classes('items-center gap-1 no-wrap'):
-                            ui.label(tab['label'] + (' ●' if dirty else '')).classes('text-sm')
-                            ui.button(
-                                icon='close',
-                                on_click=lambda _e, tid=tab['item_id']: _close_tab(tid)
-                            ).props('flat round dense size=xs').classes('text-gray-400 hover:text-red-500')
-
-            with ui.tab_panels(qtabs, value=active_tab).classes('w-full flex-grow overflow-auto'):
-                for tab in tabs_data:
-                    with ui.tab_panel(tab['item_id']):
-                        item = db.get_item(tab['item_id'])
-                        if item:
-                            from ui.request_builder import build_request_builder
-                            from ui.response_viewer import ResponseViewer
-                            # Create viewer object first (no DOM yet) so builder can reference it
-                            viewer = ResponseViewer()
-                            # Render request builder at top (references viewer for Send wiring)
-                            build_request_builder(item, viewer)
-                            # Render response viewer DOM below the builder
-                            viewer.build()
-                        else:
-                            ui.label('Request not found.').classes('text-gray-400')
-
-    tabs_ui()
-    _tabs_refresh = tabs_ui.refresh
+
+def _update_empty(view: _TabsView):
+    if view.empty_el is not None:
+        view.empty_el.set_visibility(not view.panel_els)
+
+
+def _refresh_bar(view: _TabsView):
+    if view.bar_refresh:
+        view.bar_refresh()
 
 
 def open_request_tab(item_id: str):
+    view = _view()
     tabs_data: list[dict] = nicegui_app.storage.user.get('open_tabs', [])
 
     # Already open — just switch to it
     for tab in tabs_data:
         if tab['item_id'] == item_id:
-            nicegui_app.storage.user['active_tab'] = item_id
-            if _tabs_refresh:
-                _tabs_refresh()
+            _select(view, item_id)
+            _refresh_bar(view)
             return
 
     # Load from DB and open new tab
@@ -75,42 +141,70 @@ def open_request_tab(item_id: str):
         ui.notify('Request not found', color='negative')
         return
 
-    # Max 10 tabs — close oldest if needed
-    if len(tabs_data) >= 10:
-        tabs_data.pop(0)
-
-    tabs_data.append({
+    # Ring buffer of at most _MAX_TABS tabs — append evicts the oldest
+    tabs = deque(tabs_data, maxlen=_MAX_TABS)
+    if len(tabs) == _MAX_TABS:
+        _remove_panel(view, tabs[0]['item_id'])   # its panel goes with it
+    tabs.append({
         'item_id': item_id,
         'label': item['name'],
         'dirty': False,
     })
-    nicegui_app.storage.user['open_tabs'] = tabs_data
-    nicegui_app.storage.user['active_tab'] = item_id
+    nicegui_app.storage.user['open_tabs'] = list(tabs)   # storage is JSON: no deque
+
+    if view.panels_el is not None:
+        _add_panel(view, item_id, item)
+    _select(view, item_id)
+    _update_empty(view)
+    _refresh_bar(view)
 
-    if _tabs_refresh:
-        _tabs_refresh()
+
+def register_send_task(item_id: str, task: asyncio.Task):
+    """Track this client's Send task for *item_id*, cancelling any earlier one still running."""
+    send_tasks = _view().send_tasks
+    prev = send_tasks.get(item_id)
+    if prev is not None and prev is not task and not prev.done():
+        prev.cancel()
+    send_tasks[item_id] = task
+
+
+def is_current_send_task(item_id: str, task: asyncio.Task | None) -> bool:
+    """True unless a later Send for *item_id* (in this client) has replaced *task*."""
+    current = _view().send_tasks.get(item_id)
+    return current is None or current is task
 
 
 def _close_tab(item_id: str):
+    view = _view()
+    _remove_panel(view, item_id)
+
     tabs_data: list[dict] = nicegui_app.storage.user.get('open_tabs', [])
-    tabs_data = [t for t in tabs_data if t['item_id'] != item_id]
+    remaining = [t for t in tabs_data if t['item_id'] != item_id]
+    if len(remaining) == len(tabs_data):
+        return   # not open (e.g. a stray double click): nothing to write or re-render
+    tabs_data = remaining
     nicegui_app.storage.user['open_tabs'] = tabs_data
 
     active = nicegui_app.storage.user.get('active_tab')
     if active == item_id:
-        nicegui_app.storage.user['active_tab'] = tabs_data[0]['item_id'] if tabs_data else None
+        _select(view, tabs_data[0]['item_id'] if tabs_data else None)
 
-    if _tabs_refresh:
-        _tabs_refresh()
+    _update_empty(view)
+    _refresh_bar(view)
 
 
 def set_tab_dirty(item_id: str, dirty: bool):
     """Mark a tab as having unsaved changes."""
+    # The stored list is observable: mutating the tab in place is the single write,
+    # and NiceGUI coalesces the resulting file backups into one pending task.
     tabs_data: list[dict] = nicegui_app.storage.user.get('open_tabs', [])
     for tab in tabs_data:
         if tab['item_id'] == item_id:
+            if tab.get('dirty', False) == dirty:
+                return   # no-op: skip the storage write and the re-render
             tab['dirty'] = dirty
             break
-    nicegui_app.storage.user['open_tabs'] = tabs_data
-    if _tabs_refresh:
-        _tabs_refresh()
+    else:
+        return
+    # Only the labels change — leave the panels (and their editors) alone
+    _refresh_bar(_view())
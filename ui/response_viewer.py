@@ -5,9 +5,31 @@ This two-step design lets request_tabs.py render the request builder first (top)
 and the response viewer second (bottom) while the builder still holds a reference
 to the viewer for Send-button wiring.
 """
+import asyncio
+import html
 import json
 
-from nicegui import ui
+from nicegui import background_tasks, ui
+
+_ERR_CLS = 'text-red-400'
+_INFO_CLS = 'text-gray-300'
+_CONSOLE_PRE_CLS = 'font-mono text-xs whitespace-pre-wrap break-all m-0'
+
+# Bodies longer than this are truncated until the user asks for the full text
+_BODY_PREVIEW_LIMIT = 256 * 1024
+
+
+_HEADER_COLUMNS = [
+    {'name': 'key', 'label': 'Header', 'field': 'key', 'align': 'left',
+     'classes': 'font-semibold text-gray-700', 'style': 'max-width: 220px'},
+    {'name': 'value', 'label': 'Value', 'field': 'value', 'align': 'left',
+     'classes': 'font-mono text-gray-600'},
+]
+
+
+def _console_span(line: str) -> str:
+    cls = _ERR_CLS if '[ERROR]' in line else _INFO_CLS
+    return f'<span class="{cls}">{html.escape(line)}</span>'
 
 
 class ResponseViewer:
@@ -19,9 +41,11 @@ class ResponseViewer:
         self._tabs = None
         self._console_tab = None
         self._body_container = None
-        self._headers_container = None
+        self._headers_table = None
+        self._headers_empty = None
         self._console_container = None
         self._built = False
+        self._body_task: asyncio.Task | None = None   # in-flight _populate_body, if any
 
     # ── DOM construction (called after request builder is rendered) ────────────
 
@@ -54,7 +78,17 @@ class ResponseViewer:
                     self._body_container = ui.column().classes('w-full')
 
                 with ui.tab_panel('Headers').classes('p-0 pt-1'):
-                    self._headers_container = ui.column().classes('w-full')
+                    # Quasar virtual scroll keeps the DOM proportional to visible rows
+                    self._headers_table = ui.table(
+                        columns=_HEADER_COLUMNS, rows=[], row_key='key',
+                    ).props('dense flat virtual-scroll hide-bottom').classes(
+                        'w-full text-xs'
+                    ).style('max-height: 400px')
+                    self._headers_empty = ui.label('(no headers)').classes(
+                        'text-gray-400 text-xs italic'
+                    )
+                    self._headers_table.set_visibility(False)
+                    self._headers_empty.set_visibility(False)
 
                 with ui.tab_panel(console_tab).classes('p-0 pt-1'):
                     self._console_container = ui.column().classes(
@@ -77,9 +111,12 @@ class ResponseViewer:
         self._console_container.clear()
         with self._console_container:
             if console_output:
-                for line in console_output:
-                    color = 'text-red-400' if '[ERROR]' in line else 'text-gray-300'
-                    ui.label(line).classes(f'font-mono text-xs {color}')
+                # One <pre> for the whole log: a single node and layout pass however many lines.
+                # Every line is escaped here, so the client-side sanitizer is skipped.
+                ui.html(
+                    '\n'.join(_console_span(line) for line in console_output),
+                    sanitize=False, tag='pre',
+                ).classes(_CONSOLE_PRE_CLS)
             else:
                 ui.label('(no console output)').classes('text-gray-500 text-xs italic')
 
@@ -89,8 +126,9 @@ class ResponseViewer:
             self._status_label.set_text('Aborted')
             self._error_banner.set_text(f'Request aborted: {msg}')
             self._error_banner.set_visibility(True)
+            self._cancel_body_task()
             self._body_container.clear()
-            self._headers_container.clear()
+            self._set_headers({})
             # Switch to Console tab automatically
             self._tabs.set_value(self._console_tab)
             return
@@ -104,44 +142,65 @@ class ResponseViewer:
             f'Status: {status}  •  Time: {elapsed:.0f} ms'
         )
 
-        # Body
+        # Body — formatting runs off the event loop; see _populate_body
+        self._cancel_body_task()   # a newer response replaces one still formatting
         self._body_container.clear()
         with self._body_container:
-            body_json = response_data.get('body_json')
-            if body_json is not None:
-                ui.code(
-                    json.dumps(body_json, indent=2), language='json'
-                ).classes('w-full text-sm')
-            else:
-                ui.textarea(value=response_data.get('body_text', '')).props(
-                    'readonly outlined'
-                ).classes('w-full font-mono text-sm').style('min-height: 200px')
+            ui.spinner(size='sm')
+        self._body_task = background_tasks.create(self._populate_body(response_data))
 
         # Headers
-        self._headers_container.clear()
-        with self._headers_container:
-            headers = response_data.get('headers', {})
-            if headers:
-                for key, val in sorted(headers.items()):
-                    with ui.row().classes(
-                        'w-full gap-2 border-b border-gray-100 py-1 no-wrap'
-                    ):
-                        ui.label(key).classes(
-                            'text-xs font-semibold text-gray-700 shrink-0'
-                        ).style('min-width: 180px; max-width: 220px; overflow: hidden; text-overflow: ellipsis')
-                        ui.label(val).classes(
-                            'text-xs text-gray-600 font-mono flex-grow truncate'
-                        )
+        self._set_headers(response_data.get('headers', {}))
+
+    def _cancel_body_task(self):
+        if self._body_task is not None and not self._body_task.done():
+            self._body_task.cancel()
+        self._body_task = None
+
+    async def _populate_body(self, response_data: dict):
+        body_json = response_data.get('body_json')
+        if body_json is not None:
+            text = await asyncio.to_thread(json.dumps, body_json, indent=2)
+        else:
+            text = response_data.get('body_text', '')
+        self._render_body(text, body_json is not None, truncate=True)
+
+    def _render_body(self, text: str, is_json: bool, truncate: bool):
+        self._body_container.clear()
+        with self._body_container:
+            shown = text[:_BODY_PREVIEW_LIMIT] if truncate else text
+            if is_json:
+                ui.code(shown, language='json').classes('w-full text-sm')
             else:
-                ui.label('(no headers)').classes('text-gray-400 text-xs italic')
+                ui.textarea(value=shown).props('readonly outlined').classes(
+                    'w-full font-mono text-sm'
+                ).style('min-height: 200px')
+            if len(shown) < len(text):
+                with ui.row().classes('items-center gap-2'):
+                    ui.label(
+                        f'Showing first {_BODY_PREVIEW_LIMIT // 1024} KB of {len(text) // 1024} KB'
+                    ).classes('text-xs text-gray-500')
+                    ui.button(
+                        'Show full',
+                        on_click=lambda _: self._render_body(text, is_json, truncate=False),
+                    ).props('flat dense size=sm')
+
+    def _set_headers(self, headers: dict):
+        self._headers_table.rows = [
+            {'key': key, 'value': str(val)} for key, val in sorted(headers.items())
+        ]
+        self._headers_table.update()
+        self._headers_table.set_visibility(bool(headers))
+        self._headers_empty.set_visibility(not headers)
 
     def clear(self):
         if not self._built:
             return
         self._status_label.set_text('—')
         self._error_banner.set_visibility(False)
+        self._cancel_body_task()
         self._body_container.clear()
-        self._headers_container.clear()
+        self._set_headers({})
         self._console_container.clear()
 
 
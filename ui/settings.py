@@ -2,7 +2,12 @@
 Settings panel — SSL toggle, environment manager shortcut, and import shortcut.
 build_settings_panel() can be called inside any NiceGUI context (e.g. inside a dialog).
 """
-from nicegui import ui, app as nicegui_app
+from nicegui import ui
+
+from core.settings import SETTINGS
+
+from ui.importer_dialog import open_import_dialog
+from ui.sidebar import reload_tree
 
 
 def open_settings_dialog():
@@ -12,11 +17,10 @@ def open_settings_dialog():
 
         # ── SSL toggle ───────────────────────────────────────────────────────
         ui.label('SSL Verification').classes('text-sm font-semibold text-gray-600')
-        ssl_on = getattr(nicegui_app.state, 'ssl_verify', True)
-        ssl_switch = ui.switch('SSL Verification', value=ssl_on)
+        ssl_switch = ui.switch('SSL Verification', value=SETTINGS.ssl_verify)
 
         def on_ssl_change(e):
-            nicegui_app.state.ssl_verify = e.value
+            SETTINGS.ssl_verify = e.value
 
         ssl_switch.on('update:model-value', on_ssl_change)
 
@@ -26,6 +30,24 @@ def open_settings_dialog():
 
         ui.separator()
 
+        # ── Sidebar ──────────────────────────────────────────────────────────
+        ui.label('Sidebar').classes('text-sm font-semibold text-gray-600 mt-3')
+
+        def on_flatten_change(e):
+            SETTINGS.flatten_folder_chains = e.value
+            reload_tree()
+
+        ui.switch(
+            'Merge single-folder chains', value=SETTINGS.flatten_folder_chains,
+            on_change=on_flatten_change,
+        )
+
+        ui.label(
+            'Show a folder that only contains another folder as one "a/b" row.'
+        ).classes('text-xs text-gray-400 mb-3')
+
+        ui.separator()
+
         # ── Environments ─────────────────────────────────────────────────────
         ui.label('Environments').classes('text-sm font-semibold text-gray-600 mt-3')
         ui.button(
@@ -41,7 +63,7 @@ def open_settings_dialog():
         ui.button(
             'Import Postman Collection',
             icon='upload_file',
-            on_click=lambda: (dialog.close(), _open_import_dialog()),
+            on_click=lambda: (dialog.close(), open_import_dialog()),
         ).props('flat color=primary').classes('w-full justify-start')
 
         ui.separator()
@@ -52,15 +74,11 @@ def open_settings_dialog():
 
 
 def _open_env_manager():
+    # Deferred: env_manager imports ui.layout, which imports this module
     from ui.env_manager import open_env_manager
     open_env_manager()
 
 
-def _open_import_dialog():
-    from ui.importer_dialog import open_import_dialog
-    open_import_dialog()
-
-
 def build_settings_panel():
     """Render settings inline (alternative entry point)."""
     open_settings_dialog()
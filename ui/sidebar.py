@@ -1,45 +1,192 @@
+import asyncio
+import functools
 import uuid
+from dataclasses import dataclass
+
 from nicegui import ui
 from core import db
+from core.settings import SETTINGS
+from ui.request_tabs import open_request_tab
+
+
+@dataclass(slots=True)
+class TreeNode:
+    """One sidebar row's data: only what rendering and menu actions need.
+    children is None until loaded; requests never have children."""
+    id: str
+    label: str
+    type: str                       # 'collection' | 'folder' | 'request'
+    collection_id: str
+    parent_id: str | None = None
+    method: str = 'GET'
+    children: list['TreeNode'] | None = None
+    name: str = ''                  # the item's own name; differs from label on a merged row
+    merged: tuple[tuple[str, str], ...] = ()   # (id, name) of outer folders merged into this row
+
+    def __post_init__(self):
+        self.name = self.name or self.label
+
 
 _sidebar_container: ui.element | None = None
 
+# Tree data cache: the root collection nodes (memoized per _data_version, which is
+# bumped whenever the collection list changes), and each loaded collection's subtree
+# keyed by collection id. Mutations drop only what they touch (see invalidate_tree_cache).
+_data_version = 0
+_tree_cache: dict[str, list[TreeNode]] = {}
+
+# Flat index over every loaded node, filled as children load, for O(1) lookups by id
+_nodes_by_id: dict[str, TreeNode] = {}
+_parent_by_id: dict[str, str | None] = {}
+
+# Merged folder chains: outermost folder id -> the innermost folder id its row took.
+# A rebuilt level creates the outer folder afresh, so this is how its open state survives.
+_chain_heads: dict[str, str] = {}
+
 
 # ── Tree data helpers ─────────────────────────────────────────────────────────
 
-def _build_tree_data() -> list[dict]:
-    result = []
+def invalidate_tree_cache(collection_id: str | None = None):
+    """Drop cached tree data: one collection's subtree (folders included), or (no id) the collection list.
+    Call before refresh_tree() after any write that changes names or structure."""
+    global _data_version
+    if collection_id is None:
+        _data_version += 1
+        return
+    node = _get_node(collection_id)
+    if node is not None:
+        _reload_children(node)
+    else:
+        _forget(_tree_cache.pop(collection_id, None) or [])
+
+
+def _get_node(nid: str) -> TreeNode | None:
+    return _nodes_by_id.get(nid)
+
+
+def _get_ancestors(nid: str) -> list[str]:
+    """Ids from *nid*'s parent up to its collection."""
+    ancestors = []
+    parent = _parent_by_id.get(nid)
+    while parent is not None:
+        ancestors.append(parent)
+        parent = _parent_by_id.get(parent)
+    return ancestors
+
+
+def _forget(nodes: list[TreeNode]):
+    """Drop *nodes* and all their loaded descendants from the flat index."""
+    stack = list(nodes)
+    while stack:
+        node = stack.pop()
+        _nodes_by_id.pop(node.id, None)
+        _parent_by_id.pop(node.id, None)
+        stack.extend(node.children or [])
+
+
+def _reload_children(node: TreeNode):
+    """Discard *node*'s loaded children so the next flatten re-queries them."""
+    _forget(node.children or [])
+    node.children = None
+    if node.type == 'collection':
+        _tree_cache.pop(node.id, None)
+
+
+def _build_tree_data() -> list[TreeNode]:
+    """Root collection nodes only; a collection's items are loaded when it is first expanded.
+    Unchanged data (same version) returns the same node objects without touching the DB."""
+    return _root_nodes(_data_version)
+
+
+@functools.lru_cache(maxsize=1)
+def _root_nodes(version: int) -> list[TreeNode]:
+    roots = []
     for col in db.list_collections():
-        all_items = db.list_items(col['_id'])
-        result.append({
-            'id': col['_id'],
-            'label': col['name'],
-            'type': 'collection',
-            'pre_request_script': col.get('pre_request_script', ''),
-            'post_request_script': col.get('post_request_script', ''),
-            'children': _build_children(all_items, None),
-        })
-    return result
-
-
-def _build_children(all_items: list[dict], parent_id) -> list[dict]:
+        node = TreeNode(col['_id'], col['name'], 'collection', col['_id'],
+                        children=_tree_cache.get(col['_id']))
+        _nodes_by_id[node.id] = node
+        _parent_by_id[node.id] = None
+        roots.append(node)
+    return roots
+
+
+def _query_levels(node: TreeNode) -> list[list[dict]]:
+    """The DB half of _ensure_children: *node*'s direct children, sorted, then (when folder
+    chains are merged) the children of each lone child folder down the chain. Touches no
+    tree state, so it can run on a worker thread."""
+    if node.type == 'collection':
+        return [list(db.list_children_sorted(node.id, None))]
+    levels = [list(db.list_children_sorted(node.collection_id, node.id))]
+    if SETTINGS.flatten_folder_chains:
+        while len(levels[-1]) == 1 and levels[-1][0]['type'] == 'folder':
+            levels.append(list(db.list_children_sorted(node.collection_id, levels[-1][0]['_id'])))
+    return levels
+
+
+def _ensure_children(node: TreeNode, levels: list[list[dict]] | None = None):
+    """Load a collection's or folder's direct children on first use (None until then).
+    *levels* are the already-fetched rows from _query_levels, if the caller has them."""
+    if node.type == 'request' or node.children is not None:
+        return
+    if levels is None:
+        levels = _query_levels(node)
+    if node.type == 'collection':
+        node.children = _tree_cache[node.id] = _build_children(levels[0], node.id)
+    else:
+        # Folder nodes live inside their collection's cached subtree, so this sticks too
+        node.children = _build_children(levels[0], node.id)
+        if SETTINGS.flatten_folder_chains:
+            _absorb_folder_chain(node, levels[1:])
+
+
+def _absorb_folder_chain(node: TreeNode, levels: list[list[dict]]):
+    """While *node*'s only child is a folder, merge that folder into it ("a" > "b" becomes
+    "a/b"), building each inner level from *levels* (see _query_levels). The merged row
+    takes the innermost folder's id and name, so rename acts on the folder whose contents
+    it shows; the absorbed folders are kept in node.merged."""
+    head = node.id
+    parent = _parent_by_id.get(head)
+    levels = iter(levels)
+    while node.children and len(node.children) == 1 and node.children[0].type == 'folder':
+        child = node.children[0]
+        if child.children is None:
+            items = next(levels, None)
+            if items is None:   # the chain grew since it was fetched
+                items = db.list_children_sorted(child.collection_id, child.id)
+            child.children = _build_children(items, child.id)
+        _nodes_by_id.pop(node.id, None)   # the outer id no longer names a row
+        _parent_by_id.pop(node.id, None)
+        node.merged += ((node.id, node.name),)
+        node.label = f'{node.label}/{child.label}'
+        node.name = child.name
+        node.id = child.id
+        node.children = child.children
+        _nodes_by_id[child.id] = node
+        _parent_by_id[child.id] = parent
+    if node.merged:
+        # The row was expanded to get here: its open state moves to the inner id, once
+        _chain_heads[head] = node.id
+        _expanded_ids.discard(head)
+        _expanded_ids.add(node.id)
+
+
+def _is_expanded(nid: str) -> bool:
+    """True if *nid* is open, or heads a merged chain whose row is open."""
+    return nid in _expanded_ids or _chain_heads.get(nid) in _expanded_ids
+
+
+def _build_children(items, parent_nid: str) -> list[TreeNode]:
+    """Nodes for one parent's children; *items* arrive already sorted by order.
+    *parent_nid* is the tree parent (the collection id for root-level items)."""
     nodes = []
-    for item in sorted(all_items, key=lambda x: x.get('order', 0)):
-        if item.get('parent_id') == parent_id:
-            node = {
-                'id': item['_id'],
-                'label': item['name'],
-                'type': item['type'],
-                'collection_id': item['collection_id'],
-                'parent_id': parent_id,
-                'pre_request_script': item.get('pre_request_script', ''),
-                'post_request_script': item.get('post_request_script', ''),
-                'method': item.get('method', 'GET'),
-                'url': item.get('url', ''),
-            }
-            if item['type'] == 'folder':
-                node['children'] = _build_children(all_items, item['_id'])
-            nodes.append(node)
+    for item in items:
+        node = TreeNode(
+            item['_id'], item['name'], item['type'], item['collection_id'],
+            item.get('parent_id'), item.get('method', 'GET'),
+        )
+        _nodes_by_id[node.id] = node
+        _parent_by_id[node.id] = parent_nid
+        nodes.append(node)
     return nodes
 
 
@@ -55,121 +202,302 @@ METHOD_COLORS = {
     'OPTIONS': 'text-gray-600',
 }
 
-
-def _render_tree(nodes: list[dict]):
-    for node in nodes:
-        _render_node(node)
-
-
-def _render_node(node: dict):
-    ntype = node['type']
-    nid = node['id']
-    label = node['label']
-
-    if ntype == 'collection':
-        # Wrap in a div so the context menu attaches to the whole row (including the
-        # expansion header), not just the collapsible body where Quasar puts default-slot content.
-        with ui.element('div').classes('w-full'):
-            with ui.context_menu():
-                ui.menu_item('Add Folder',
-                             lambda nid=nid: _add_item_dialog('folder', nid, None))
-                ui.menu_item('Add Request',
-                             lambda nid=nid: _add_item_dialog('request', nid, None))
-                ui.separator()
-                ui.menu_item('Edit Scripts',
-                             lambda nid=nid, lbl=label, nd=node: _edit_scripts_dialog('collection', nid, lbl, nd))
-                ui.separator()
-                ui.menu_item('Delete Collection',
-                             lambda nid=nid, lbl=label: _delete_dialog('collection', nid, lbl))
-            with ui.expansion(label, icon='folder').classes('w-full text-sm'):
-                for child in node.get('children', []):
-                    _render_node(child)
-
-    elif ntype == 'folder':
-        col_id = node.get('collection_id', '')
-        with ui.element('div').classes('w-full'):
-            with ui.context_menu():
-                ui.menu_item('Add Request',
-                             lambda col_id=col_id, nid=nid: _add_item_dialog('request', col_id, nid))
-                ui.separator()
-                ui.menu_item('Edit Scripts',
-                             lambda nid=nid, lbl=label, nd=node: _edit_scripts_dialog('folder', nid, lbl, nd))
-                ui.menu_item('Rename',
-                             lambda nid=nid, lbl=label: _rename_dialog(nid, lbl))
-                ui.separator()
-                ui.menu_item('Delete Folder',
-                             lambda nid=nid, lbl=label: _delete_dialog('folder', nid, lbl))
-            with ui.expansion(label, icon='folder_open').classes('w-full text-sm pl-3'):
-                for child in node.get('children', []):
-                    _render_node(child)
-
-    elif ntype == 'request':
-        method = node.get('method', 'GET')
-        color = METHOD_COLORS.get(method, 'text-gray-600')
-        with ui.row().classes(
-            'w-full cursor-pointer hover:bg-blue-50 rounded px-2 py-1 items-center gap-1 pl-6'
-        ) as row:
-            ui.label(method).classes(f'text-xs font-bold w-14 shrink-0 {color}')
-            ui.label(label).classes('text-sm flex-grow truncate')
-            with ui.context_menu():
-                ui.menu_item('Rename',
-                             lambda nid=nid, lbl=label: _rename_dialog(nid, lbl))
-                ui.menu_item('Duplicate',
-                             lambda nid=nid: _duplicate_request(nid))
-                ui.separator()
-                ui.menu_item('Delete',
-                             lambda nid=nid, lbl=label: _delete_dialog('request', nid, lbl))
+# Full class string per method, assembled once rather than per rendered row
+METHOD_CLASSES = {m: f'text-xs font-bold w-14 shrink-0 {c}' for m, c in METHOD_COLORS.items()}
+_DEFAULT_METHOD_CLASS = 'text-xs font-bold w-14 shrink-0 text-gray-600'
+
+
+# The tree is drawn as a flat, virtualized list: expanded nodes are flattened into
+# _visible_rows and only the rows inside the scroll viewport (plus a buffer) exist
+# in the DOM. Spacer divs stand in for the rows above and below the window.
+_ROW_H = 28                 # px; every tree row renders at exactly this height
+_BUFFER_ROWS = 10           # extra rows materialized above and below the viewport
+_DEFAULT_VIEWPORT_H = 800   # px; used until the first scroll event reports the real size
+
+_tree: list[TreeNode] = []
+_expanded_ids: set[str] = set()
+_visible_rows: list[tuple[int, TreeNode]] = []   # (depth, node) in display order
+_rows_container: ui.element | None = None
+_viewport = {'top': 0.0, 'height': _DEFAULT_VIEWPORT_H}
+_window: tuple[int, int] | None = None       # [start, end) of the rendered slice
+_window_ids: list[str] = []                  # node ids rendered in that slice, in order
+_bottom_spacer: ui.element | None = None     # stands in for the rows below the slice
+_window_total = 0                            # len(_visible_rows) when the spacers were sized
+_toggle_seq = 0                              # bumped per expand/collapse; stale loads don't render
+_row_els: dict[str, tuple[ui.row, ui.label, tuple]] = {}   # node id -> (row, name label, _row_shape)
+
+
+def _flatten_visible(nodes: list[TreeNode]) -> list[tuple[int, TreeNode]]:
+    """Depth-first walk (explicit stack) of *nodes*, descending only into expanded ones."""
+    rows = []
+    stack = [(0, node) for node in reversed(nodes)]
+    while stack:
+        depth, node = stack.pop()
+        rows.append((depth, node))
+        if _is_expanded(node.id):
+            _ensure_children(node)
+            stack.extend((depth + 1, child) for child in reversed(node.children or []))
+    return rows
+
+
+def _window_bounds() -> tuple[int, int]:
+    start = max(0, int(_viewport['top'] // _ROW_H) - _BUFFER_ROWS)
+    end = min(len(_visible_rows), start + int(_viewport['height'] // _ROW_H) + 2 * _BUFFER_ROWS)
+    return start, end
+
+
+def _bottom_spacer_style(end: int) -> str:
+    return f'height: {(len(_visible_rows) - end) * _ROW_H}px'
+
+
+def _render_window(force: bool = False):
+    global _window, _window_ids, _bottom_spacer, _window_total
+    if _rows_container is None:
+        return
+    start, end = _window_bounds()
+    if not force and _window == (start, end):
+        return
+    _window = (start, end)
+    _window_ids = [node.id for _, node in _visible_rows[start:end]]
+    _window_total = len(_visible_rows)
+    _row_els.clear()
+    _rows_container.clear()
+    with _rows_container:
+        ui.element('div').style(f'height: {start * _ROW_H}px')
+        for depth, node in _visible_rows[start:end]:
+            _render_row(depth, node)
+        _bottom_spacer = ui.element('div').style(_bottom_spacer_style(end))
+
+
+def _row_shape(depth: int, node: TreeNode) -> tuple:
+    """Everything a rendered row shows besides its label text."""
+    has_children = node.children is None or bool(node.children)
+    return depth, node.type, node.method, node.id in _expanded_ids, has_children
+
+
+def _patch_window():
+    """Bring the rendered rows in line with _visible_rows after a data change.
+    If the same ids occupy the same slice, a row whose only change is its label is
+    updated in place and a row with any other change (method, type, chevron) is
+    re-rendered on its own; any structural change (add/delete/move) re-renders the slice."""
+    global _window_total
+    start, end = _window_bounds()
+    rows = _visible_rows[start:end]
+    if (start, end) != _window or [node.id for _, node in rows] != _window_ids:
+        _render_window(force=True)
+        return
+    for index, (depth, node) in enumerate(rows, start=1):   # index 0 is the top spacer
+        row_el, label_el, shape = _row_els[node.id]
+        if shape != _row_shape(depth, node):
+            with _rows_container:
+                _render_row(depth, node).move(target_index=index)
+            row_el.delete()
+        elif label_el.text != node.label:
+            label_el.set_text(node.label)
+    # Rows added or removed below the slice change only the bottom spacer (and scroll height)
+    if len(_visible_rows) != _window_total:
+        _window_total = len(_visible_rows)
+        _bottom_spacer.style(replace=_bottom_spacer_style(end))
+
+
+def _on_scroll(e):
+    _viewport['top'] = e.vertical_position
+    _viewport['height'] = e.vertical_container_size or _DEFAULT_VIEWPORT_H
+    _render_window()
+
+
+async def _toggle(nid: str):
+    global _visible_rows, _toggle_seq
+    _toggle_seq += 1
+    seq = _toggle_seq
+    if nid in _expanded_ids:
+        _expanded_ids.discard(nid)
+    else:
+        _expanded_ids.add(nid)
+        node = _get_node(nid)
+        if node is not None and node.type != 'request' and node.children is None:
+            # Only the query runs off the event loop; the tree itself is updated here
+            levels = await asyncio.to_thread(_query_levels, node)
+            if _get_node(nid) is node:   # not dropped by a reload while we waited
+                _ensure_children(node, levels)
+            if seq != _toggle_seq:
+                return   # a later expand/collapse has rendered (or will render) instead
+    _visible_rows = _flatten_visible(_tree)
+    _render_window(force=True)
+
+
+def _render_row(depth: int, node: TreeNode) -> ui.row:
+    ntype = node.type
+    nid = node.id
+    label = node.label
+
+    with ui.row().classes(
+        'w-full cursor-pointer hover:bg-blue-50 rounded px-2 items-center gap-1 no-wrap'
+    ).style(f'height: {_ROW_H}px; padding-left: {depth * 12 + 4}px') as row:
+        if ntype in ('collection', 'folder'):
+            expanded = nid in _expanded_ids
+            ui.icon('expand_more' if expanded else 'chevron_right').classes('text-gray-500 text-sm')
+            ui.icon('folder' if ntype == 'collection' else 'folder_open').classes('text-gray-600 text-base')
+            label_el = ui.label(label).classes('text-sm flex-grow truncate')
+            row.on('click', lambda _e, nid=nid: _toggle(nid))
+        else:
+            method = node.method
+            ui.label(method).classes(METHOD_CLASSES.get(method, _DEFAULT_METHOD_CLASS))
+            label_el = ui.label(label).classes('text-sm flex-grow truncate')
             row.on('dblclick', lambda _e, nid=nid: _open_request(nid))
 
+        # The menu is built on the first right-click only; most rows never get one
+        row.on('contextmenu.prevent', lambda _e, row=row, nid=nid: _ensure_context_menu(row, nid))
+    _row_els[nid] = (row, label_el, _row_shape(depth, node))
+    return row
+
+
+def _ensure_context_menu(row: ui.row, nid: str):
+    if getattr(row, '_sidebar_menu', None) is not None:
+        return   # already built: Quasar's context-menu handling opens it from now on
+    node = _get_node(nid)   # current node: the row may outlive a subtree reload
+    if node is None:
+        return
+    with row:
+        with ui.context_menu() as menu:
+            _build_menu_items(node)
+    row._sidebar_menu = menu
+    menu.open()
+
+
+def _build_menu_items(node: TreeNode):
+    # Items carry only (action, id); _dispatch resolves the current node when clicked
+    nid = node.id
+    if node.type == 'collection':
+        ui.menu_item('Add Folder', lambda nid=nid: _dispatch('add_folder', nid))
+        ui.menu_item('Add Request', lambda nid=nid: _dispatch('add_request', nid))
+        ui.separator()
+        ui.menu_item('Edit Scripts', lambda nid=nid: _dispatch('edit_scripts', nid))
+        ui.separator()
+        ui.menu_item('Delete Collection', lambda nid=nid: _dispatch('delete', nid))
+    elif node.type == 'folder':
+        ui.menu_item('Add Request', lambda nid=nid: _dispatch('add_request', nid))
+        ui.separator()
+        if node.merged:
+            # Every folder in a merged chain has its own scripts, and they all run
+            for fid, fname in (*node.merged, (nid, node.name)):
+                ui.menu_item(f'Edit Scripts: {fname}',
+                             lambda nid=nid, fid=fid: _dispatch('edit_scripts', nid, fid))
+        else:
+            ui.menu_item('Edit Scripts', lambda nid=nid: _dispatch('edit_scripts', nid))
+        ui.menu_item('Rename', lambda nid=nid: _dispatch('rename', nid))
+        ui.separator()
+        ui.menu_item('Delete Folder', lambda nid=nid: _dispatch('delete', nid))
+    else:
+        ui.menu_item('Rename', lambda nid=nid: _dispatch('rename', nid))
+        ui.menu_item('Duplicate', lambda nid=nid: _dispatch('duplicate', nid))
+        ui.separator()
+        ui.menu_item('Delete', lambda nid=nid: _dispatch('delete', nid))
+
+
+def _dispatch(action: str, nid: str, folder_id: str | None = None):
+    """Run a context-menu *action* against the node currently indexed under *nid*.
+    *folder_id* picks one folder of a merged row's chain (edit_scripts only)."""
+    node = _get_node(nid)
+    if node is None:
+        ui.notify('Item not found', color='negative')
+        return
+    if action == 'add_folder':
+        _add_item_dialog('folder', node.collection_id, None)
+    elif action == 'add_request':
+        parent_id = None if node.type == 'collection' else node.id
+        _add_item_dialog('request', node.collection_id, parent_id)
+    elif action == 'edit_scripts':
+        chain = dict(node.merged)
+        if folder_id in chain:
+            _edit_scripts_dialog(node.type, folder_id, chain[folder_id])
+        else:
+            _edit_scripts_dialog(node.type, node.id, node.name)
+    elif action == 'rename':
+        _rename_dialog(node.id, node.name, node.collection_id)
+    elif action == 'duplicate':
+        _duplicate_request(node.id)
+    elif action == 'delete':
+        # A merged row deletes its whole chain: removing the outermost folder cascades
+        target = node.merged[0][0] if node.merged else node.id
+        _delete_dialog(node.type, target, node.label, node.collection_id, _parent_by_id.get(node.id))
+
 
 # ── Actions ───────────────────────────────────────────────────────────────────
 
+def _finish_action(dialog: ui.dialog | None, subtree_id: str | None = None, message: str | None = None):
+    """Common tail of every tree mutation: close the dialog, redraw, notify.
+    Element updates queued during one handler leave in the same outbox flush, so
+    keeping the whole tail in one synchronous call means one websocket message."""
+    if dialog is not None:
+        dialog.close()
+    refresh_tree(subtree_id)
+    if message:
+        ui.notify(message)
+
+
 def _open_request(item_id: str):
-    from ui.request_tabs import open_request_tab
     open_request_tab(item_id)
 
 
-def _add_item_dialog(item_type: str, collection_id: str, parent_id):
-    type_label = 'Folder' if item_type == 'folder' else 'Request'
+_EMPTY_NAME_MSG = 'Name cannot be empty'
+
+
+def _name_dialog(title: str, input_label: str, submit_label: str, on_confirm, initial: str = ''):
+    """Open a single-input name dialog; *on_confirm(name)* runs with the stripped,
+    non-empty name, after which the dialog closes."""
     with ui.dialog() as dialog, ui.card().classes('w-80'):
-        ui.label(f'New {type_label}').classes('text-lg font-bold')
-        name_input = ui.input('Name').classes('w-full')
+        ui.label(title).classes('text-lg font-bold')
+        name_input = ui.input(input_label, value=initial).classes('w-full')
 
-        def confirm():
+        def submit():
             name = name_input.value.strip()
             if not name:
-                ui.notify('Name cannot be empty', color='negative')
+                ui.notify(_EMPTY_NAME_MSG, color='negative')
                 return
-            data = {
-                'collection_id': collection_id,
-                'parent_id': parent_id,
-                'type': item_type,
-                'name': name,
-                'order': 0,
-                'pre_request_script': '',
-                'post_request_script': '',
-            }
-            if item_type == 'request':
-                data.update({
-                    'method': 'GET',
-                    'url': '',
-                    'params': [],
-                    'headers': [],
-                    'body': {'mode': 'none', 'raw': '', 'urlencoded': []},
-                    'auth': {'type': 'none'},
-                })
-            db.create_item(data)
+            on_confirm(name)
             dialog.close()
-            refresh_tree()
 
-        name_input.on('keydown.enter', lambda _e: confirm())
+        name_input.on('keydown.enter', lambda _e: submit())
         with ui.row().classes('mt-2'):
-            ui.button('Create', on_click=confirm).props('color=primary')
+            ui.button(submit_label, on_click=submit).props('color=primary')
             ui.button('Cancel', on_click=dialog.close).props('flat')
     dialog.open()
 
 
-def _delete_dialog(item_type: str, item_id: str, label: str):
+def _add_item_dialog(item_type: str, collection_id: str, parent_id):
+    def create(name: str):
+        data = {
+            'collection_id': collection_id,
+            'parent_id': parent_id,
+            'type': item_type,
+            'name': name,
+            'order': 0,
+            'pre_request_script': '',
+            'post_request_script': '',
+        }
+        if item_type == 'request':
+            data.update({
+                'method': 'GET',
+                'url': '',
+                'params': [],
+                'headers': [],
+                'body': {'mode': 'none', 'raw': '', 'urlencoded': []},
+                'auth': {'type': 'none'},
+            })
+        db.create_item(data)
+        # Reload just the parent level and make sure the new item is visible
+        target = parent_id or collection_id
+        _expanded_ids.add(target)
+        _expanded_ids.update(_get_ancestors(target))
+        _finish_action(None, target)
+
+    type_label = 'Folder' if item_type == 'folder' else 'Request'
+    _name_dialog(f'New {type_label}', 'Name', 'Create', create)
+
+
+def _delete_dialog(item_type: str, item_id: str, label: str, collection_id: str,
+                   parent_id: str | None = None):
     with ui.dialog() as dialog, ui.card().classes('w-80'):
         ui.label('Confirm Delete').classes('text-lg font-bold')
         ui.label(f'Delete "{label}"?').classes('text-sm text-gray-600')
@@ -179,10 +507,12 @@ def _delete_dialog(item_type: str, item_id: str, label: str):
         def confirm():
             if item_type == 'collection':
                 db.delete_collection(item_id)
+                invalidate_tree_cache()
+                invalidate_tree_cache(collection_id)
+                _finish_action(dialog)
             else:
                 db.delete_item(item_id)
-            dialog.close()
-            refresh_tree()
+                _finish_action(dialog, parent_id or collection_id)
 
         with ui.row().classes('mt-2'):
             ui.button('Delete', on_click=confirm).props('color=negative')
@@ -190,25 +520,12 @@ def _delete_dialog(item_type: str, item_id: str, label: str):
     dialog.open()
 
 
-def _rename_dialog(item_id: str, current_name: str):
-    with ui.dialog() as dialog, ui.card().classes('w-80'):
-        ui.label('Rename').classes('text-lg font-bold')
-        name_input = ui.input('New name', value=current_name).classes('w-full')
+def _rename_dialog(item_id: str, current_name: str, collection_id: str):
+    def rename(name: str):
+        db.update_item(item_id, {'name': name})
+        _finish_action(None, _parent_by_id.get(item_id) or collection_id)
 
-        def confirm():
-            name = name_input.value.strip()
-            if not name:
-                ui.notify('Name cannot be empty', color='negative')
-                return
-            db.update_item(item_id, {'name': name})
-            dialog.close()
-            refresh_tree()
-
-        name_input.on('keydown.enter', lambda _e: confirm())
-        with ui.row().classes('mt-2'):
-            ui.button('Rename', on_click=confirm).props('color=primary')
-            ui.button('Cancel', on_click=dialog.close).props('flat')
-    dialog.open()
+    _name_dialog('Rename', 'New name', 'Rename', rename, initial=current_name)
 
 
 def _duplicate_request(item_id: str):
@@ -217,16 +534,21 @@ def _duplicate_request(item_id: str):
         ui.notify('Item not found', color='negative')
         return
     new_item = dict(item)
-    new_item['_id'] = str(uuid.uuid4())
+    new_item['_id'] = uuid.uuid4().hex
     new_item['name'] = item['name'] + ' (copy)'
     db.create_item(new_item)
-    refresh_tree()
-    ui.notify(f'Duplicated "{item["name"]}"')
+    _finish_action(None, _parent_by_id.get(item_id) or item['collection_id'],
+                   f'Duplicated "{item["name"]}"')
 
 
-def _edit_scripts_dialog(node_type: str, node_id: str, label: str, node: dict):
-    pre_script = node.get('pre_request_script', '')
-    post_script = node.get('post_request_script', '')
+def _edit_scripts_dialog(node_type: str, node_id: str, label: str):
+    # Scripts aren't part of the tree projection — load them when the dialog opens
+    doc = db.get_collection(node_id) if node_type == 'collection' else db.get_item(node_id)
+    if not doc:
+        ui.notify('Item not found', color='negative')
+        return
+    pre_script = doc.get('pre_request_script', '')
+    post_script = doc.get('post_request_script', '')
 
     with ui.dialog() as dialog, ui.card().classes('w-full max-w-3xl'):
         ui.label(f'Edit Scripts: {label}').classes('text-lg font-bold')
@@ -264,36 +586,40 @@ def _edit_scripts_dialog(node_type: str, node_id: str, label: str, node: dict):
 
 
 def _new_collection_dialog():
-    with ui.dialog() as dialog, ui.card().classes('w-80'):
-        ui.label('New Collection').classes('text-lg font-bold')
-        name_input = ui.input('Collection name').classes('w-full')
-
-        def confirm():
-            name = name_input.value.strip()
-            if not name:
-                ui.notify('Name cannot be empty', color='negative')
-                return
-            db.create_collection(name)
-            dialog.close()
-            refresh_tree()
+    def create(name: str):
+        db.create_collection(name)
+        invalidate_tree_cache()
+        _finish_action(None)
 
-        name_input.on('keydown.enter', lambda _e: confirm())
-        with ui.row().classes('mt-2'):
-            ui.button('Create', on_click=confirm).props('color=primary')
-            ui.button('Cancel', on_click=dialog.close).props('flat')
-    dialog.open()
+    _name_dialog('New Collection', 'Collection name', 'Create', create)
 
 
 # ── Sidebar build / refresh ───────────────────────────────────────────────────
 
-def _render_sidebar_content():
+def _load_tree() -> tuple[list[TreeNode], list[tuple[int, TreeNode]]]:
+    """All DB work for a full sidebar render: root nodes plus expanded levels."""
+    tree = _build_tree_data()
+    return tree, _flatten_visible(tree)
+
+
+def _render_sidebar_header():
     with ui.row().classes('w-full items-center justify-between mb-2 px-1'):
         ui.label('Collections').classes('font-semibold text-gray-700 text-sm')
         ui.button(icon='add', on_click=_new_collection_dialog).props('flat round dense size=sm')
 
-    nodes = _build_tree_data()
-    if nodes:
-        _render_tree(nodes)
+
+def _render_sidebar_content(tree: list[TreeNode], rows: list[tuple[int, TreeNode]]):
+    global _tree, _visible_rows, _rows_container, _window
+    _render_sidebar_header()
+
+    _tree = tree
+    _rows_container = None
+    if _tree:
+        _visible_rows = rows
+        _window = None
+        with ui.scroll_area(on_scroll=_on_scroll).classes('w-full').style('height: calc(100vh - 120px)'):
+            _rows_container = ui.column().classes('w-full gap-0')
+        _render_window()
     else:
         with ui.column().classes('w-full items-center mt-8 gap-2'):
             ui.icon('folder_open').classes('text-4xl text-gray-300')
@@ -302,16 +628,57 @@ def _render_sidebar_content():
 
 
 async def build_sidebar():
-    global _sidebar_container
+    global _sidebar_container, _data_version
     with ui.column().classes('w-full gap-0') as container:
         _sidebar_container = container
-        _render_sidebar_content()
+        # Paint the header and a spinner first; the tree swaps in once loaded
+        _render_sidebar_header()
+        ui.spinner(size='md').classes('self-center mt-8')
+    # The caches only see this process's writes: a page load re-reads what teammates changed
+    _data_version += 1
+    _drop_subtrees()
+    tree, rows = await asyncio.to_thread(_load_tree)
+    container.clear()
+    with container:
+        _render_sidebar_content(tree, rows)
+
+
+def _drop_subtrees():
+    """Forget every loaded subtree, so the next flatten re-reads each open level from the DB."""
+    for root in _tree:   # memoized root nodes hold their subtree too
+        root.children = None
+    _tree_cache.clear()
+    _nodes_by_id.clear()
+    _parent_by_id.clear()
+    _chain_heads.clear()
+
+
+def reload_tree():
+    """Drop every cached subtree and rebuild (e.g. after a display setting changes)."""
+    global _data_version
+    _data_version += 1
+    _drop_subtrees()
+    refresh_tree()
 
 
-def refresh_tree():
-    global _sidebar_container
+def refresh_tree(subtree_id: str | None = None):
+    """Bring the sidebar up to date, reusing the rendered rows where possible.
+    With *subtree_id*, only that node's children are re-queried. The rendered window
+    is then patched in place (see _patch_window); the sidebar is only rebuilt from
+    scratch when it switches between empty and non-empty."""
+    global _tree, _visible_rows
     if _sidebar_container is None:
         return
+    node = _get_node(subtree_id) if subtree_id else None
+    if node is not None:
+        _reload_children(node)
+    if _rows_container is not None:
+        tree = _tree if node is not None else _build_tree_data()
+        if tree:
+            _tree = tree
+            _visible_rows = _flatten_visible(_tree)
+            _patch_window()
+            return
     _sidebar_container.clear()
     with _sidebar_container:
-        _render_sidebar_content()
+        _render_sidebar_content(*_load_tree())